@@ -0,0 +1,278 @@
+import contextlib
+import threading
+import time
+from collections.abc import Iterator
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django import urls
+from django.db import connection
+
+# In-process metrics, exposed in the Prometheus text format by /metrics. Every worker process
+# keeps its own values: scrape each process, or run a single one.
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if labels.keys() != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {labels}")
+
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _format_labels(self, key: tuple[str, ...], **extra: str) -> str:
+        pairs = [*zip(self.label_names, key), *extra.items()]
+        if not pairs:
+            return ""
+
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type_name}"
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield from super().render()
+        with self._lock:
+            values = sorted(self._values.items())
+
+        for key, value in values:
+            yield f"{self.name}{self._format_labels(key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = _DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: the (non cumulative) bucket counts, then the sum and count.
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[0][position] += 1
+                    break
+            counts[1] += value
+            counts[2] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> Iterator[str]:
+        yield from super().render()
+        with self._lock:
+            values = sorted((key, (list(b), s, c)) for key, (b, s, c) in self._values.items())
+
+        for key, (bucket_counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = self._format_labels(key, le=_format_value(bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_bucket{self._format_labels(key, le='+Inf')} {count}"
+            yield f"{self.name}_sum{self._format_labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{self._format_labels(key)} {count}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = _DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        return "".join(
+            f"{line}\n" for metric in self._metrics.values() for line in metric.render()
+        )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+registry = Registry()
+
+OBS_REQUEST_SECONDS = registry.histogram(
+    "obs_request_duration_seconds", "OBS WebSocket request latency.", ("method",)
+)
+OBS_REQUEST_FAILURES = registry.counter(
+    "obs_request_failures_total", "OBS WebSocket requests that failed.", ("method",)
+)
+OBS_CONNECTION_FAILURES = registry.counter(
+    "obs_connection_failures_total", "Failed attempts to connect to OBS."
+)
+OBS_CLIENT_ERRORS = registry.counter(
+    "obs_client_errors_total", "OBS client operations that failed, raised or not.", ("operation",)
+)
+OBS_BATCHED_REQUEST_FAILURES = registry.counter(
+    "obs_batched_request_failures_total",
+    "Requests of OBS request batches that OBS rejected.",
+    ("request_type",),
+)
+OBS_INPUT_UPDATES_SKIPPED = registry.counter(
+    "obs_input_updates_skipped_total", "OBS input writes skipped as OBS already had the settings."
+)
+OBS_UPDATE_FAILURES = registry.counter(
+    "obs_update_failures_total", "OBS updates of a run transition that failed."
+)
+RTMP_STATS_FETCH_SECONDS = registry.histogram(
+    "rtmp_stats_fetch_duration_seconds", "Time to download the RTMP server statistics."
+)
+RTMP_STATS_PARSE_SECONDS = registry.histogram(
+    "rtmp_stats_parse_duration_seconds",
+    "Time to parse the RTMP server statistics and match the streams to runners.",
+)
+RTMP_STATS_FAILURES = registry.counter(
+    "rtmp_stats_failures_total", "RTMP server statistics collections that failed."
+)
+RUN_TRANSITION_SECONDS = registry.histogram(
+    "run_transition_duration_seconds",
+    "Time to move an event to its next run, up to the commit.",
+)
+RUN_TRANSITION_OBS_SECONDS = registry.histogram(
+    "run_transition_obs_duration_seconds",
+    "Time from the start of a run transition until OBS is updated, background queue included.",
+)
+VIEW_SECONDS = registry.histogram(
+    "http_view_duration_seconds", "Time to answer a request, per view.", ("view",)
+)
+VIEW_DB_QUERIES = registry.histogram(
+    "http_view_db_queries", "Database queries per request, per view.", ("view",), _QUERY_BUCKETS
+)
+VIEW_DB_SECONDS = registry.histogram(
+    "http_view_db_duration_seconds", "Database time per request, per view.", ("view",)
+)
+
+
+class _QueryTimer:
+    def __init__(self) -> None:
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.queries += 1
+
+
+class MetricsMiddleware:
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+
+        return self._record(request, self.get_response)
+
+    async def _acall(self, request):
+        if is_sync_view(request):
+            # The view queries the database from the thread sensitive executor, the queries are
+            # only seen from that thread.
+            return await sync_to_async(self._record)(request, async_to_sync(self.get_response))
+
+        # Async views query the database from other threads, only their duration is recorded.
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        VIEW_SECONDS.observe(time.perf_counter() - start, view=_get_view_name(request))
+
+        return response
+
+    def _record(self, request, get_response):
+        query_timer = _QueryTimer()
+        start = time.perf_counter()
+        with connection.execute_wrapper(query_timer):
+            response = get_response(request)
+
+        # Streamed responses are only timed up to their first byte.
+        view = _get_view_name(request)
+        VIEW_SECONDS.observe(time.perf_counter() - start, view=view)
+        VIEW_DB_QUERIES.observe(query_timer.queries, view=view)
+        VIEW_DB_SECONDS.observe(query_timer.duration, view=view)
+
+        return response
+
+
+def is_sync_view(request) -> bool:
+    # Middlewares run before the request is resolved to its view, the URL is resolved here too.
+    try:
+        match = urls.resolve(request.path_info, getattr(request, "urlconf", None))
+    except urls.Resolver404:
+        return False
+
+    return not iscoroutinefunction(match.func)
+
+
+def _get_view_name(request) -> str:
+    # URL names keep the label cardinality bounded, unlike paths.
+    if (match := getattr(request, "resolver_match", None)) is None:
+        return "unmatched"
+
+    return match.url_name or match.view_name or "unnamed"
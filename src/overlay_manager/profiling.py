@@ -0,0 +1,275 @@
+import collections
+import cProfile
+import datetime
+import pstats
+import threading
+import time
+import uuid
+
+import attrs
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from overlay_manager import metrics
+from overlay_manager.vendors.obs import connection as obs_connection
+
+# Opt-in request profiler. A request is profiled when it carries the profiling header or query
+# flag and its user can edit events, the last profiles are kept in memory by each worker process.
+
+HEADER = "X-Profile"
+QUERY_FLAG = "_profile"
+PERMISSION = "runs.change_eventdata"
+
+# Calls under this share of the request time are left out of the call tree.
+_CALL_TREE_MIN_SHARE = 0.01
+_CALL_TREE_MAX_DEPTH = 40
+
+# Since Python 3.12 a single profiler can be active per process, and it sees the functions run by
+# every thread meanwhile. Requests are profiled one at a time, the others are served unprofiled.
+_profiler_lock = threading.Lock()
+
+
+@attrs.define
+class SqlQuery:
+    sql: str
+    params: str
+    duration: float
+    many: bool
+    # Queries with the same SQL and parameters sent earlier in the request.
+    duplicates: int = 0
+
+
+@attrs.define
+class ObsCall:
+    method: str
+    duration: float
+    error: str | None
+
+
+@attrs.define
+class CallNode:
+    function: str
+    calls: int
+    own_time: float
+    total_time: float
+    children: list["CallNode"] = attrs.Factory(list)
+
+
+@attrs.define
+class Profile:
+    id: str
+    created_at: datetime.datetime
+    method: str
+    path: str
+    view: str
+    user: str
+    status_code: int
+    duration: float
+    sql_queries: list[SqlQuery]
+    obs_calls: list[ObsCall]
+    call_tree: list[CallNode]
+
+    @property
+    def sql_duration(self) -> float:
+        return sum(query.duration for query in self.sql_queries)
+
+    @property
+    def sql_duplicates(self) -> int:
+        return sum(1 for query in self.sql_queries if query.duplicates)
+
+    @property
+    def obs_duration(self) -> float:
+        return sum(call.duration for call in self.obs_calls)
+
+
+class ProfileStore:
+    def __init__(self, size: int) -> None:
+        self._lock = threading.Lock()
+        self._profiles: collections.deque[Profile] = collections.deque(maxlen=size)
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> list[Profile]:
+        # Most recent first.
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: str) -> Profile | None:
+        with self._lock:
+            return next((profile for profile in self._profiles if profile.id == profile_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+
+_store: ProfileStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = ProfileStore(settings.PROFILING_HISTORY)
+
+        return _store
+
+
+class _SqlRecorder:
+    def __init__(self) -> None:
+        self.queries: list[SqlQuery] = []
+        self._seen: collections.Counter[tuple[str, str]] = collections.Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            key = (sql, repr(params))
+            self.queries.append(
+                SqlQuery(
+                    sql=sql,
+                    params=key[1],
+                    duration=duration,
+                    many=many,
+                    duplicates=self._seen[key],
+                )
+            )
+            self._seen[key] += 1
+
+
+class ProfilingMiddleware:
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+
+        # Only a header or query lookup for requests that did not ask for a profile.
+        if not _is_requested(request):
+            return self.get_response(request)
+
+        return self._profile(request, self.get_response)
+
+    async def _acall(self, request):
+        # Async views run across threads and the event loop, they are not profiled.
+        if not _is_requested(request) or not metrics.is_sync_view(request):
+            return await self.get_response(request)
+
+        # Sync views are profiled from the thread sensitive executor they run in.
+        return await sync_to_async(self._profile)(request, async_to_sync(self.get_response))
+
+    def _profile(self, request, get_response):
+        if not request.user.has_perm(PERMISSION):
+            return get_response(request)
+        if not _profiler_lock.acquire(blocking=False):
+            return get_response(request)
+
+        try:
+            return self._run_profiled(request, get_response)
+        finally:
+            _profiler_lock.release()
+
+    def _run_profiled(self, request, get_response):
+        sql_recorder = _SqlRecorder()
+        obs_calls = []
+        listener_token = obs_connection.request_listener.set(
+            lambda method, duration, error: obs_calls.append(
+                ObsCall(method, duration, repr(error) if error else None)
+            )
+        )
+        profiler = cProfile.Profile()
+
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(sql_recorder):
+                response = profiler.runcall(get_response, request)
+        finally:
+            duration = time.perf_counter() - start
+            obs_connection.request_listener.reset(listener_token)
+
+        match = getattr(request, "resolver_match", None)
+        profile = Profile(
+            id=uuid.uuid4().hex,
+            created_at=datetime.datetime.now(datetime.UTC),
+            method=request.method,
+            path=request.get_full_path(),
+            view=(match.view_name if match else "") or "",
+            user=str(request.user),
+            status_code=response.status_code,
+            duration=duration,
+            sql_queries=sql_recorder.queries,
+            obs_calls=obs_calls,
+            call_tree=_build_call_tree(pstats.Stats(profiler)),
+        )
+        get_profile_store().add(profile)
+
+        response[f"{HEADER}-Id"] = profile.id
+        return response
+
+
+def _is_requested(request) -> bool:
+    return HEADER in request.headers or QUERY_FLAG in request.GET
+
+
+def _build_call_tree(stats: pstats.Stats) -> list[CallNode]:
+    # pstats only keeps caller to callee edges with their totals. A function called from several
+    # places gets the times of its callees split in proportion to the time spent from each caller.
+    callees = collections.defaultdict(dict)
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        for caller, edge in callers.items():
+            callees[caller][function] = edge
+
+    roots = [function for function, entry in stats.stats.items() if not entry[4]]
+    total = sum(stats.stats[function][3] for function in roots) or 1.0
+
+    def build(function, calls: int, own_time: float, total_time: float, path, depth) -> CallNode:
+        node = CallNode(_format_function(function), calls, own_time, total_time)
+        if depth >= _CALL_TREE_MAX_DEPTH or not (function_time := stats.stats[function][3]):
+            return node
+
+        share = total_time / function_time
+        for callee, (_, callee_calls, callee_own_time, callee_time) in sorted(
+            callees[function].items(), key=lambda item: item[1][3], reverse=True
+        ):
+            if callee in path or callee_time * share < total * _CALL_TREE_MIN_SHARE:
+                continue
+            node.children.append(
+                build(
+                    callee,
+                    callee_calls,
+                    callee_own_time * share,
+                    callee_time * share,
+                    path | {callee},
+                    depth + 1,
+                )
+            )
+
+        return node
+
+    return [
+        build(function, *stats.stats[function][1:4], frozenset({function}), 0)
+        for function in roots
+        if stats.stats[function][3] >= total * _CALL_TREE_MIN_SHARE
+    ]
+
+
+def _format_function(function: tuple[str, int, str]) -> str:
+    filename, line, name = function
+    if filename == "~":
+        # Built-in functions, e.g. "<method 'execute' of 'sqlite3.Cursor' objects>".
+        return name
+
+    return f"{name} ({filename}:{line})"
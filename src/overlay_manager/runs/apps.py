@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class RunsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "overlay_manager.runs"
+
+    def ready(self) -> None:
+        # Register signal receivers.
+        from overlay_manager.runs.operations import overlay  # noqa: F401
@@ -1 +1,2 @@
 from .event import EventForm
+from .schedule import ScheduleImportForm
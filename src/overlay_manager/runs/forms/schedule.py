@@ -0,0 +1,7 @@
+from django import forms
+
+
+class ScheduleImportForm(forms.Form):
+    schedule = forms.FileField()
+    format = forms.ChoiceField(choices=[("csv", "CSV"), ("json", "JSON (Oengus, Horaro)")])
+    replace = forms.BooleanField(required=False)
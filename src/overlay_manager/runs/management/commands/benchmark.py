@@ -0,0 +1,267 @@
+import datetime
+import json
+import logging
+import platform
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+import django
+from django import urls
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+
+from overlay_manager.runs import models, obs_texts
+from overlay_manager.runs.operations import runs as run_operations
+from overlay_manager.runs.operations import schedule as schedule_operations
+from overlay_manager.vendors.obs import fake_server
+
+_BENCHMARK_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+_OVERLAY_URLS = [
+    ("current-run-name", {}),
+    ("current-run-category", {}),
+    ("current-run-platform", {}),
+    ("current-run-estimate", {}),
+    ("current-run-trigger-warning", {}),
+    ("current-runner-name", {"index": 0}),
+    ("current-runner-pronouns", {"index": 0}),
+    ("current-runner-name-and-pronouns", {"index": 0}),
+    ("next-run", {}),
+    ("event-state", {}),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the hot paths (transitions, replanning, schedule edits, dashboards and overlays) "
+        "on a synthetic event, in a throwaway test database"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--runs", type=int, default=300)
+        parser.add_argument("--people", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--obs",
+            action="store_true",
+            help="Include the OBS update in transitions, using the configured OBS_HOST",
+        )
+        parser.add_argument(
+            "--fake-obs",
+            action="store_true",
+            help="Include the OBS update in transitions, against an in-process fake OBS",
+        )
+        parser.add_argument(
+            "--fake-obs-latency",
+            type=float,
+            default=0.0,
+            help="Delay of every fake OBS message, in milliseconds",
+        )
+        parser.add_argument("--keepdb", action="store_true", help="Keep the test database")
+        parser.add_argument("--output", help="Write the JSON results to this file")
+
+    def handle(
+        self,
+        runs,
+        people,
+        repeat,
+        seed,
+        obs,
+        fake_obs,
+        fake_obs_latency,
+        keepdb,
+        output,
+        **options,
+    ) -> None:
+        obs_server = None
+        obs_settings = {}
+        if fake_obs:
+            obs = True
+            obs_server = fake_server.FakeObsServer(
+                scenes=obs_texts.scene_sources(), latency=fake_obs_latency / 1000, seed=seed
+            )
+            obs_settings = {
+                "OBS_HOST": obs_server.host,
+                "OBS_PORT": obs_server.start(),
+                "OBS_PASSWORD": "",
+            }
+
+        setup_test_environment()
+        old_database_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+
+        # Logging would dominate the timings of the OBS paths.
+        logging.disable(logging.CRITICAL)
+        try:
+            # The overlay state cache must not be shared with a running deployment. Without
+            # background jobs, the OBS update is run right after the transition commit.
+            with override_settings(
+                CACHES=_BENCHMARK_CACHES, BACKGROUND_JOBS_ENABLED=False, **obs_settings
+            ):
+                results = _Benchmark(runs, people, repeat, seed, obs, obs_server).run()
+        finally:
+            logging.disable(logging.NOTSET)
+            if obs_server is not None:
+                obs_server.stop()
+            connection.creation.destroy_test_db(old_database_name, verbosity=0, keepdb=keepdb)
+
+        report = json.dumps(
+            {
+                "meta": {
+                    "runs": runs,
+                    "people": people,
+                    "repeat": repeat,
+                    "seed": seed,
+                    "obs": obs,
+                    "fake_obs": fake_obs,
+                    "fake_obs_latency": fake_obs_latency,
+                    "database": connection.vendor,
+                    "django": django.get_version(),
+                    "python": platform.python_version(),
+                    "created_at": datetime.datetime.now(datetime.UTC).isoformat(),
+                },
+                "results": results,
+            },
+            indent=2,
+        )
+
+        if output:
+            with open(output, "w") as f:
+                f.write(report)
+        else:
+            self.stdout.write(report)
+
+
+class _Benchmark:
+    def __init__(
+        self,
+        runs: int,
+        people: int,
+        repeat: int,
+        seed: int,
+        obs: bool,
+        obs_server: fake_server.FakeObsServer | None = None,
+    ) -> None:
+        self.runs = runs
+        self.people = people
+        self.repeat = repeat
+        self.random = random.Random(seed)
+        self.obs = obs
+        self.obs_server = obs_server
+        self.results = []
+
+    def run(self) -> list[dict]:
+        self.measure("import_schedule", self.import_event, repeat=1)
+
+        self.client = Client()
+        self.client.force_login(
+            get_user_model().objects.create_superuser("benchmark", "benchmark@example.com")
+        )
+
+        # Start in the middle of the event, with runs before and after the current one.
+        event = self.get_event()
+        event.current_run = event.runs.order_by("run_index")[self.runs // 2]
+        event.save()
+
+        if self.obs:
+            self.measure("next_run_for_event", lambda: self.next_run(with_obs=True))
+        else:
+            self.measure("set_next_run", lambda: self.next_run(with_obs=False))
+        self.measure("set_previous_run", lambda: self.get_event().set_previous_run())
+        self.measure(
+            "update_all_runs_for_events",
+            lambda: run_operations.update_all_runs_for_events(self.get_event()),
+        )
+
+        run = self.get_event().next_slot
+        self.measure("edit_run_move_down", lambda: self.get("edit-run-move-down", run_id=run.id))
+        self.measure("edit_run_move_up", lambda: self.get("edit-run-move-up", run_id=run.id))
+
+        self.measure("event_details", lambda: self.get("event-details"))
+        self.measure("event_edit", lambda: self.get("event-edit"))
+
+        for name, kwargs in _OVERLAY_URLS:
+            self.measure(f"overlay:{name}:cold", lambda: self.get(name, cold=True, **kwargs))
+            self.measure(f"overlay:{name}:warm", lambda: self.get(name, **kwargs))
+
+        return self.results
+
+    def measure(self, name: str, func: Callable[[], None], repeat: int | None = None) -> None:
+        wall_times = []
+        queries = []
+        obs_round_trips = []
+        obs_requests = []
+
+        for _ in range(repeat or self.repeat):
+            if self.obs_server is not None:
+                self.obs_server.reset_records()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                func()
+                wall_times.append(time.perf_counter() - start)
+            queries.append(len(captured))
+            if self.obs_server is not None:
+                obs_round_trips.append(self.obs_server.round_trips)
+                obs_requests.append(len(self.obs_server.requests))
+
+        result = {
+            "name": name,
+            "queries": max(queries),
+            "wall_time": {
+                "min": min(wall_times),
+                "median": statistics.median(wall_times),
+                "max": max(wall_times),
+            },
+        }
+        if self.obs_server is not None:
+            result["obs_round_trips"] = max(obs_round_trips)
+            result["obs_requests"] = max(obs_requests)
+        self.results.append(result)
+
+    def import_event(self) -> None:
+        names = [f"Person {position}" for position in range(self.people)]
+        rows = []
+        for position in range(self.runs):
+            is_intermission = self.random.random() < 0.1
+            rows.append(
+                schedule_operations.ScheduleRow(
+                    name=f"Game {position}",
+                    category=self.random.choice(["Any%", "100%", "Low%", "Glitchless"]),
+                    platform=self.random.choice(["SNES", "PC", "N64", "PS2"]),
+                    estimated_time=datetime.timedelta(minutes=self.random.randint(10, 180)),
+                    runners=tuple(self.random.sample(names, self.random.randint(1, 4))),
+                    commentators=tuple(self.random.sample(names, self.random.randint(0, 2))),
+                    is_intermission=is_intermission,
+                    # The scenes laid out by the fake OBS.
+                    obs_scene_id="Intermission" if is_intermission else "1P - 4/3",
+                )
+            )
+        schedule_operations.import_schedule(
+            "benchmark", rows, event_start_at=datetime.datetime.now(datetime.UTC), replace=True
+        )
+
+    def get_event(self) -> models.EventData:
+        return models.EventData.objects.select_related("current_run").get(name="benchmark")
+
+    def next_run(self, with_obs: bool) -> None:
+        event = self.get_event()
+        if with_obs:
+            run_operations.next_run_for_event(event)
+        else:
+            event.set_next_run()
+
+    def get(self, url_name: str, cold: bool = False, **kwargs) -> None:
+        if cold:
+            cache.clear()
+
+        response = self.client.get(
+            urls.reverse(url_name, kwargs={"event_name": "benchmark", **kwargs})
+        )
+        if response.status_code >= 400:
+            raise RuntimeError(f"{url_name} answered {response.status_code}")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from overlay_manager.runs import models
+from overlay_manager.runs.operations import schedule as schedule_operations
+
+
+class Command(BaseCommand):
+    help = "Export an event schedule as CSV or JSON"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("event_name")
+        parser.add_argument("--format", choices=["csv", "json"], default="csv")
+
+    def handle(self, event_name, format, **options) -> None:
+        try:
+            event = models.EventData.objects.get(name=event_name)
+        except models.EventData.DoesNotExist as e:
+            raise CommandError(f"Event {event_name} does not exist") from e
+
+        if format == "json":
+            lines = schedule_operations.export_schedule_json(event)
+        else:
+            lines = schedule_operations.export_schedule_csv(event)
+
+        for line in lines:
+            self.stdout.write(line, ending="")
+        self.stdout.write("")
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import attrs
+from django.core.management.base import BaseCommand
+
+from overlay_manager.runs import obs_texts
+from overlay_manager.vendors.obs import fake_server
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a stand-in OBS WebSocket with the overlay scenes, to measure and load test the "
+        "OBS updates without OBS"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=4455)
+        parser.add_argument("--password", default="")
+        parser.add_argument(
+            "--latency", type=float, default=0.0, help="Delay of every message, in milliseconds"
+        )
+        parser.add_argument(
+            "--jitter", type=float, default=0.0, help="Random latency variation, in milliseconds"
+        )
+        parser.add_argument(
+            "--request-cost",
+            type=float,
+            default=0.0,
+            help="Processing time of every request, batched or not, in milliseconds",
+        )
+        parser.add_argument(
+            "--failure-rate", type=float, default=0.0, help="Share of requests that fail"
+        )
+        parser.add_argument(
+            "--disconnect-rate",
+            type=float,
+            default=0.0,
+            help="Share of messages that drop the connection instead of being answered",
+        )
+        parser.add_argument(
+            "--fail",
+            action="append",
+            default=[],
+            metavar="REQUEST_TYPE",
+            help="Request type that always fails, can be repeated",
+        )
+        parser.add_argument("--seed", type=int)
+        parser.add_argument("--record", help="Append every request to this file as JSON lines")
+
+    def handle(
+        self,
+        host,
+        port,
+        password,
+        latency,
+        jitter,
+        request_cost,
+        failure_rate,
+        disconnect_rate,
+        fail,
+        seed,
+        record,
+        **options,
+    ) -> None:
+        record_file = open(record, "a") if record else None
+
+        def write_record(request: fake_server.RecordedRequest) -> None:
+            record_file.write(json.dumps(attrs.asdict(request)) + "\n")
+            record_file.flush()
+
+        server = fake_server.FakeObsServer(
+            host=host,
+            port=port,
+            password=password,
+            scenes=obs_texts.scene_sources(),
+            latency=latency / 1000,
+            jitter=jitter / 1000,
+            request_cost=request_cost / 1000,
+            failure_rate=failure_rate,
+            disconnect_rate=disconnect_rate,
+            failing_requests=tuple(fail),
+            seed=seed,
+            recorder=write_record if record_file else None,
+        )
+        self.stdout.write(f"Fake OBS WebSocket on ws://{host}:{port}, quit with CONTROL-C.")
+
+        try:
+            asyncio.run(server.serve())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if record_file:
+                record_file.close()
+
+        self.stdout.write(f"Served {server.round_trips} round trips.")
@@ -0,0 +1,38 @@
+import datetime
+import pathlib
+
+from django.core.management.base import BaseCommand, CommandError
+
+from overlay_manager.runs.operations import schedule as schedule_operations
+
+
+class Command(BaseCommand):
+    help = "Import an event schedule from a CSV or JSON (Oengus, Horaro) file"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("event_name")
+        parser.add_argument("path", type=pathlib.Path)
+        parser.add_argument("--format", choices=["csv", "json"])
+        parser.add_argument(
+            "--start-at",
+            type=datetime.datetime.fromisoformat,
+            help="Event start, required when the event does not exist yet",
+        )
+        parser.add_argument(
+            "--replace", action="store_true", help="Delete the event runs before the import"
+        )
+
+    def handle(self, event_name, path, format, start_at, replace, **options) -> None:
+        schedule_format = format or path.suffix.lstrip(".").lower()
+
+        try:
+            rows = schedule_operations.read_schedule(
+                path.read_text(encoding="utf-8-sig"), schedule_format
+            )
+            event = schedule_operations.import_schedule(
+                event_name, rows, event_start_at=start_at, replace=replace
+            )
+        except (OSError, schedule_operations.CouldNotImportSchedule) as e:
+            raise CommandError(str(e)) from e
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {len(rows)} runs into {event.name}"))
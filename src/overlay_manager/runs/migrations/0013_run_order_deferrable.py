@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:26
+
+import django.db.models.constraints
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("runs", "0012_alter_person_rtmp_host"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="run",
+            name="run_order",
+        ),
+        migrations.AddConstraint(
+            model_name="run",
+            constraint=models.UniqueConstraint(
+                deferrable=django.db.models.constraints.Deferrable["DEFERRED"],
+                fields=("event", "run_index"),
+                name="run_order",
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:32
+
+from django.db import migrations
+
+RUN_INDEX_GAP = 1024
+
+
+def spread_run_indexes(apps, schema_editor):
+    Run = apps.get_model("runs", "Run")
+    _renumber(Run, RUN_INDEX_GAP)
+
+
+def pack_run_indexes(apps, schema_editor):
+    Run = apps.get_model("runs", "Run")
+    _renumber(Run, 1)
+
+
+def _renumber(Run, gap):
+    runs = list(Run.objects.order_by("event_id", "run_index").only("id", "event_id", "run_index"))
+    position = 0
+    event_id = None
+    for run in runs:
+        position = position + 1 if run.event_id == event_id else 1
+        event_id = run.event_id
+        run.run_index = position * gap
+
+    Run.objects.bulk_update(runs, ["run_index"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("runs", "0013_run_order_deferrable"),
+    ]
+
+    operations = [
+        migrations.RunPython(spread_run_indexes, pack_run_indexes),
+    ]
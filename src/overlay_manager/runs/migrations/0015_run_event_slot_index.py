@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("runs", "0014_run_sparse_run_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="run",
+            index=models.Index(
+                fields=["event", "is_intermission", "run_index"], name="run_event_slot_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("runs", "0015_run_event_slot_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="eventdata",
+            name="upcoming_runs",
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("runs", "0016_event_upcoming_runs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="run",
+            name="obs_texts",
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,9 +1,16 @@
 import datetime
+import time
 from typing import Optional
 
+from django import dispatch
+from django.core.cache import cache
 from django.db import models, transaction
+from django.db.models import Q, prefetch_related_objects
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.conf import settings
 
+from overlay_manager.runs import obs_texts, signals
+
 
 class Person(models.Model):
     id = models.AutoField(primary_key=True)
@@ -34,33 +41,62 @@ class EventData(models.Model):
     shift = models.DurationField(null=False, blank=False, default=datetime.timedelta(minutes=0))
     event_start_at = models.DateTimeField(null=False, blank=False, auto_created=True)
     event_end_at = models.DateTimeField(null=False, blank=False, auto_created=True)
+    # Display data of the next non-intermission runs, refreshed on each transition and schedule
+    # change so that overlays and OBS updates read it with the event row.
+    upcoming_runs = models.JSONField(null=True, blank=True, editable=False)
 
     def __str__(self) -> str:
         return self.name
 
     @property
     def next_run(self) -> Optional["Run"]:
+        return self._get_next_run(include_intermissions=False)
+
+    @property
+    def next_slot(self) -> Optional["Run"]:
+        return self._get_next_run(include_intermissions=True)
+
+    def get_upcoming_runs(self) -> list[dict]:
+        # Events saved before the window existed compute it on first use.
+        if self.upcoming_runs is None:
+            self.refresh_upcoming_runs()
+            EventData.objects.filter(id=self.id).update(upcoming_runs=self.upcoming_runs)
+
+        return self.upcoming_runs
+
+    def refresh_upcoming_runs(self) -> None:
         current_run_index = 0
         if self.current_run is not None:
             current_run_index = self.current_run.run_index
 
-        try:
-            return Run.objects.filter(
-                run_index__gt=current_run_index, is_intermission=False
-            ).order_by("run_index").first()
-        except Run.DoesNotExist:
-            return None
-
-    @property
-    def next_slot(self) -> Optional["Run"]:
+        # The window also fills the intermission OBS texts, whatever the overlays show.
+        size = max(settings.OVERLAY_STATE_UPCOMING_RUNS, len(obs_texts.INTERMISSION_SOURCES))
+        self.upcoming_runs = [
+            run.to_display()
+            for run in self.runs.filter(run_index__gt=current_run_index, is_intermission=False)
+            .order_by("run_index")
+            .prefetch_related("runners")[:size]
+        ]
+
+    def refresh_from_db(self, *args, **kwargs) -> None:
+        self.__dict__.pop("_next_runs", None)
+        super().refresh_from_db(*args, **kwargs)
+
+    def _get_next_run(self, include_intermissions: bool) -> Optional["Run"]:
+        # Memoized per instance (i.e. per request) for the current run it was looked up from.
         current_run_index = 0
         if self.current_run is not None:
             current_run_index = self.current_run.run_index
 
-        try:
-            return Run.objects.filter(run_index__gt=current_run_index).order_by("run_index").first()
-        except Run.DoesNotExist:
-            return None
+        next_runs = self.__dict__.setdefault("_next_runs", {})
+        key = (self.current_run_id, current_run_index, include_intermissions)
+        if key not in next_runs:
+            runs = self.runs.filter(run_index__gt=current_run_index)
+            if not include_intermissions:
+                runs = runs.filter(is_intermission=False)
+            next_runs[key] = runs.order_by("run_index").first()
+
+        return next_runs[key]
 
     @transaction.atomic
     def set_next_run(self) -> None:
@@ -72,7 +108,7 @@ class EventData(models.Model):
         if previous_run := self.current_run:
             previous_run.is_finished = True
             previous_run.actual_end_at = now
-            previous_run.save()
+            previous_run.save(update_fields=["is_finished", "actual_end_at"])
 
         self.current_run = self.next_slot
         if current_run := self.current_run:
@@ -81,16 +117,18 @@ class EventData(models.Model):
             self.shift = (
                 delta if delta > datetime.timedelta(minutes=0) else datetime.timedelta(minutes=0)
             )
-            current_run.save()
+            current_run.save(update_fields=["actual_start_at"])
 
+        self.refresh_upcoming_runs()
         self.save()
+        self.notify_state_changed()
 
     @transaction.atomic
     def set_previous_run(self) -> None:
         if next_run := self.current_run:
             next_run.is_finished = False
             next_run.actual_start_at = None
-            next_run.save()
+            next_run.save(update_fields=["is_finished", "actual_start_at"])
         else:
             return
 
@@ -100,10 +138,154 @@ class EventData(models.Model):
         if current_run:
             current_run.is_finished = False
             current_run.actual_end_at = None
-            current_run.save()
+            current_run.save(update_fields=["is_finished", "actual_end_at"])
 
         self.current_run = current_run
+        self.refresh_upcoming_runs()
         self.save()
+        self.notify_state_changed()
+
+    def notify_state_changed(self) -> None:
+        # The version is bumped after commit so that a snapshot built from the new version can
+        # never hold uncommitted data.
+        def on_commit() -> None:
+            self.bump_state_version(self.name)
+            signals.event_state_changed.send(sender=self.__class__, event_name=self.name)
+
+        _on_commit_once(("event-state", self.name), on_commit)
+
+    @staticmethod
+    def get_state_version(event_name: str) -> int:
+        return cache.get_or_set(_state_version_key(event_name), _initial_state_version, None)
+
+    @staticmethod
+    def bump_state_version(event_name: str) -> int:
+        try:
+            return cache.incr(_state_version_key(event_name))
+        except ValueError:
+            version = _initial_state_version()
+            cache.set(_state_version_key(event_name), version, None)
+            return version
+
+
+def format_duration(duration: datetime.timedelta) -> str:
+    seconds = int(duration.total_seconds())
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02}:{seconds % 60:02}"
+
+
+def _on_commit_once(key: tuple, func) -> None:
+    # A callback already registered under the same key by the current transaction is enough,
+    # e.g. when every run of an event is deleted. Rolled back savepoints drop their callbacks.
+    connection = transaction.get_connection()
+    if any(
+        getattr(callback, "once_key", None) == key for _, callback, _ in connection.run_on_commit
+    ):
+        return
+
+    func.once_key = key
+    transaction.on_commit(func)
+
+
+def _state_version_key(event_name: str) -> str:
+    return f"event-state-version:{event_name}"
+
+
+def _initial_state_version() -> int:
+    # Start from the clock so that a lost counter never reuses the version of a cached snapshot.
+    return time.time_ns() // 1000
+
+
+# Runs are ordered by sparse `run_index` values so that a run can be inserted or moved between two
+# others by writing its own row only, the event is renumbered when no room is left.
+RUN_INDEX_GAP = 1024
+
+_RENDERED_FIELDS = {"name", "category", "platform", "estimated_time"}
+# Run fields shown by the overlays (see Run.to_display). Moves are saved with run_index only, they
+# go through update_runs_from_index which notifies the event itself.
+_DISPLAYED_FIELDS = {
+    "name",
+    "category",
+    "platform",
+    "trigger_warning",
+    "estimated_time",
+    "is_intermission",
+    "obs_scene_id",
+}
+
+
+class RunManager(models.Manager):
+    def append_index(self, event: EventData) -> int:
+        max_index = self.filter(event=event).aggregate(models.Max("run_index"))["run_index__max"]
+        return (max_index or 0) + RUN_INDEX_GAP
+
+    # Returns whether the event runs had to be renumbered, loaded runs then hold stale indexes.
+    @transaction.atomic
+    def move_before(self, run: "Run", next_run: Optional["Run"]) -> bool:
+        self._lock_event(run, next_run)
+        if next_run is None:
+            previous_run = self.filter(event_id=run.event_id).exclude(id=run.id)
+        else:
+            previous_run = self.filter(
+                event_id=run.event_id, run_index__lt=next_run.run_index
+            ).exclude(id=run.id)
+
+        return self.move_after(run, previous_run.order_by("-run_index").first())
+
+    # Returns whether the event runs had to be renumbered, loaded runs then hold stale indexes.
+    @transaction.atomic
+    def move_after(self, run: "Run", previous_run: Optional["Run"]) -> bool:
+        self._lock_event(run, previous_run)
+        run_index = self._index_after(run, previous_run)
+        rebalanced = run_index is None
+
+        if rebalanced:
+            self.rebalance(run.event_id)
+            if previous_run is not None:
+                previous_run.refresh_from_db(fields=["run_index"])
+            run_index = self._index_after(run, previous_run)
+
+        run.run_index = run_index
+        run.save(update_fields=["run_index"])
+        return rebalanced
+
+    def refresh_obs_texts(self, runs: list["Run"]) -> None:
+        prefetch_related_objects(runs, "runners", "commentators")
+        for run in runs:
+            run.obs_texts = run.render_obs_texts()
+
+        self.bulk_update(runs, ["obs_texts"])
+
+    def rebalance(self, event_id: int) -> None:
+        runs = list(self.filter(event_id=event_id).order_by("run_index").only("id", "run_index"))
+        for position, run in enumerate(runs, start=1):
+            run.run_index = position * RUN_INDEX_GAP
+
+        # Relies on the deferred run_order constraint, indexes are swapped in a single update.
+        self.bulk_update(runs, ["run_index"])
+
+    def _lock_event(self, run: "Run", neighbour_run: Optional["Run"]) -> None:
+        # Moves within an event are serialized, two moves into the same gap would otherwise get
+        # the same index. The neighbour may have been renumbered by the move we waited for.
+        EventData.objects.select_for_update().only("id").get(id=run.event_id)
+        if neighbour_run is not None:
+            neighbour_run.refresh_from_db(fields=["run_index"])
+
+    def _index_after(self, run: "Run", previous_run: Optional["Run"]) -> int | None:
+        lower = previous_run.run_index if previous_run else 0
+        upper = (
+            self.filter(event_id=run.event_id, run_index__gt=lower)
+            .exclude(id=run.id)
+            .order_by("run_index")
+            .values_list("run_index", flat=True)
+            .first()
+        )
+
+        if upper is None:
+            return lower + RUN_INDEX_GAP
+        if upper - lower < 2:
+            return None
+
+        return (lower + upper) // 2
 
 
 class Run(models.Model):
@@ -130,13 +312,158 @@ class Run(models.Model):
 
     obs_scene_id = models.CharField(max_length=255, null=True, blank=True)
 
+    # Text of each OBS source showing the run, rendered when the run or its people change.
+    obs_texts = models.JSONField(null=True, blank=True, editable=False)
+
+    objects = RunManager()
+
     class Meta:
-        constraints = [models.UniqueConstraint(fields=["event", "run_index"], name="run_order")]
-        indexes = [models.Index(fields=["event", "run_index"])]
+        constraints = [
+            # Deferred so that a range of runs can be renumbered with set-based updates.
+            models.UniqueConstraint(
+                fields=["event", "run_index"],
+                name="run_order",
+                deferrable=models.Deferrable.DEFERRED,
+            )
+        ]
+        indexes = [
+            models.Index(fields=["event", "run_index"]),
+            # Next run lookups skip the intermissions of the event.
+            models.Index(
+                fields=["event", "is_intermission", "run_index"], name="run_event_slot_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} - {self.category} ({self.run_index})"
 
+    def save(self, *args, **kwargs) -> None:
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or not _RENDERED_FIELDS.isdisjoint(update_fields):
+            self.obs_texts = self.render_obs_texts()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "obs_texts"}
+
+        super().save(*args, **kwargs)
+
+    def get_obs_texts(self) -> dict[str, str]:
+        # Runs saved before the texts existed, or whose people changed, render on first use.
+        if self.obs_texts is None:
+            self.obs_texts = self.render_obs_texts()
+            Run.objects.filter(id=self.id).update(obs_texts=self.obs_texts)
+
+        return self.obs_texts
+
+    def render_obs_texts(self) -> dict[str, str]:
+        runners, commentators = [], []
+        if self.pk is not None:
+            runners = sorted(self.runners.all(), key=lambda person: person.name)
+            commentators = sorted(self.commentators.all(), key=lambda person: person.name)
+
+        return obs_texts.render_run_texts(
+            name=self.name,
+            category=self.category,
+            platform=self.platform,
+            estimate=format_duration(self.estimated_time),
+            runners=[(person.name, person.pronouns) for person in runners],
+            commentators=[(person.name, person.pronouns) for person in commentators],
+        )
+
+    def to_display(self) -> dict:
+        return {
+            "id": self.id,
+            "run_index": self.run_index,
+            "name": self.name,
+            "category": self.category,
+            "platform": self.platform,
+            "trigger_warning": self.trigger_warning,
+            "estimated_time": format_duration(self.estimated_time),
+            "is_intermission": self.is_intermission,
+            "obs_scene_id": self.obs_scene_id,
+            "runners": [
+                {"name": runner.name, "pronouns": runner.pronouns}
+                for runner in sorted(self.runners.all(), key=lambda runner: runner.id)
+            ],
+        }
+
     @property
     def start_at(self) -> datetime.datetime:
         return self.actual_start_at or (self.planning_start_at + self.event.shift)
+
+
+def _event_changed(event_id: int) -> None:
+    # Run and people edits (e.g. from the admin) change what the overlays show, the upcoming runs
+    # are refreshed and the event notified once per transaction.
+    def on_commit() -> None:
+        event = EventData.objects.select_related("current_run").filter(id=event_id).first()
+        if event is None:
+            return
+
+        event.refresh_upcoming_runs()
+        EventData.objects.filter(id=event_id).update(upcoming_runs=event.upcoming_runs)
+        EventData.bump_state_version(event.name)
+        signals.event_state_changed.send(sender=EventData, event_name=event.name)
+
+    _on_commit_once(("event-changed", event_id), on_commit)
+
+
+@dispatch.receiver(post_save, sender=Run)
+def _run_saved(sender, instance, created, update_fields, **kwargs) -> None:
+    if created or update_fields is None or not _DISPLAYED_FIELDS.isdisjoint(update_fields):
+        _event_changed(instance.event_id)
+
+
+@dispatch.receiver(post_delete, sender=Run)
+def _run_deleted(sender, instance, **kwargs) -> None:
+    _event_changed(instance.event_id)
+
+
+@dispatch.receiver(m2m_changed, sender=Run.runners.through)
+@dispatch.receiver(m2m_changed, sender=Run.commentators.through)
+def _run_people_changed(sender, instance, action, reverse, pk_set, **kwargs) -> None:
+    # Only runners are shown by the overlays, commentators are in the OBS texts only.
+    displayed = sender is Run.runners.through
+
+    if reverse:
+        # People added to or removed from runs through the person side, the runs render again
+        # on next use.
+        if action == "pre_clear":
+            relation = "runners" if displayed else "commentators"
+            runs = Run.objects.filter(**{relation: instance})
+        elif action in ("post_add", "post_remove"):
+            runs = Run.objects.filter(id__in=pk_set)
+        else:
+            return
+
+        if displayed:
+            for event_id in set(runs.values_list("event_id", flat=True)):
+                _event_changed(event_id)
+        runs.update(obs_texts=None)
+        return
+
+    if action in ("post_add", "post_remove", "post_clear"):
+        instance.obs_texts = instance.render_obs_texts()
+        Run.objects.filter(id=instance.id).update(obs_texts=instance.obs_texts)
+        if displayed:
+            _event_changed(instance.event_id)
+
+
+@dispatch.receiver(post_save, sender=Person)
+def _person_saved(sender, instance, created, **kwargs) -> None:
+    if not created:
+        _person_changed(instance)
+
+
+@dispatch.receiver(pre_delete, sender=Person)
+def _person_deleted(sender, instance, **kwargs) -> None:
+    # The person's runs are found before the delete, it removes the M2M rows without sending
+    # m2m_changed.
+    _person_changed(instance)
+
+
+def _person_changed(person: Person) -> None:
+    Run.objects.filter(Q(runners=person) | Q(commentators=person)).update(obs_texts=None)
+    for event_id in set(
+        Run.objects.filter(runners=person).values_list("event_id", flat=True).distinct()
+    ):
+        _event_changed(event_id)
@@ -0,0 +1,158 @@
+# OBS text sources of the run and intermission scenes, and the texts they show.
+
+RUNNER_NAME_SOURCES = [
+    ["Runneureuse_1_1P_4:3", "Runneureuse_1_1P_WS", "Runneureuse_1_2P_WS"],
+    ["Runneureuse_2_2P_WS"],
+    [],
+    [],
+]
+RUNNER_PRONOUNS_SOURCES = [
+    [
+        "Runneureuse_1_Pronoms_1P_4:3",
+        "Runneureuse_1_Pronoms_1P_WS",
+        "Runneureuse_1_Pronoms_2P_WS",
+    ],
+    ["Runneureuse_2_Pronoms_2P_WS"],
+    [],
+    [],
+]
+COMMENTATOR_NAME_SOURCES = [
+    ["Commentateurice_1_1P_4:3", "Commentateurice_1_1P_WS", "Commentateurice_1_2P_WS"],
+    ["Commentateurice_2_1P_4:3", "Commentateurice_2_1P_WS", "Commentateurice_2_2P_WS"],
+]
+COMMENTATOR_PRONOUNS_SOURCES = [
+    [
+        "Commentateurice_1_Pronoms_1P_4:3",
+        "Commentateurice_1_Pronoms_1P_WS",
+        "Commentateurice_1_Pronoms_2P_WS",
+    ],
+    [
+        "Commentateurice_2_Pronoms_1P_4:3",
+        "Commentateurice_2_Pronoms_1P_WS",
+        "Commentateurice_2_Pronoms_2P_WS",
+    ],
+]
+TITLE_SOURCES = ["Titre_1P_WS", "Titre_1P_4:3", "Titre_4P"]
+CATEGORY_SOURCES = ["Categorie_1P_WS", "Categorie_1P_4:3", "Categorie_4P"]
+PLATFORM_SOURCES = ["Support/Année_1P_WS", "Support/Année_1P_4:3", "Support/Année_4P"]
+ESTIMATE_SOURCES = ["Estimate"]
+NEXT_RUN_SOURCES = []
+
+# Title, category, runner name, runner pronouns and estimate of the next runs on intermissions.
+INTERMISSION_SOURCES = [
+    (
+        "Titre_NextRun",
+        "Categorie_NextRun",
+        "Runneureuse_1_NextRun",
+        "Runneureuse_1_Pronoms_NextRun",
+        "Estimate_NextRun",
+    ),
+    (
+        "Titre_Next",
+        "Categorie_Next",
+        "Runneureuse_1_Next",
+        "Runneureureuse_1_Pronoms_Next",
+        "Estimate_Next",
+    ),
+    (
+        "Titre_Next2",
+        "Categorie_Next2",
+        "Runneureuse_1_Next2",
+        "Runneureuse_1_Pronoms_Next2",
+        "Estimate_Next2",
+    ),
+    (
+        "Titre_Next3",
+        "Categorie_Next3",
+        "Runneureuse_1_Next3",
+        "Runneureuse_1_Pronoms_Next3",
+        "Estimate_Next3",
+    ),
+]
+
+# Commentator placeholder used when nobody comments a run.
+NO_COMMENTATOR = "Personne"
+
+
+def render_run_texts(
+    name: str | None,
+    category: str | None,
+    platform: str | None,
+    estimate: str,
+    runners: list[tuple[str, str | None]],
+    commentators: list[tuple[str, str | None]],
+) -> dict[str, str]:
+    texts = {}
+
+    # Slots without a runner or commentator are cleared, not left with the previous run texts.
+    for position, (name_sources, pronouns_sources) in enumerate(
+        zip(RUNNER_NAME_SOURCES, RUNNER_PRONOUNS_SOURCES)
+    ):
+        runner_name, runner_pronouns = runners[position] if position < len(runners) else ("", "")
+        texts.update((source, runner_name) for source in name_sources)
+        texts.update((source, runner_pronouns or "") for source in pronouns_sources)
+
+    for position, (name_sources, pronouns_sources) in enumerate(
+        zip(COMMENTATOR_NAME_SOURCES, COMMENTATOR_PRONOUNS_SOURCES)
+    ):
+        commentator_name, commentator_pronouns = (
+            commentators[position] if position < len(commentators) else ("", "")
+        )
+        if commentator_name == NO_COMMENTATOR:
+            commentator_name = ""
+        texts.update((source, commentator_name) for source in name_sources)
+        texts.update((source, commentator_pronouns or "") for source in pronouns_sources)
+
+    texts.update((source, name or "") for source in TITLE_SOURCES)
+    texts.update((source, category or "") for source in CATEGORY_SOURCES)
+    texts.update((source, platform or "") for source in PLATFORM_SOURCES)
+    texts.update((source, estimate) for source in ESTIMATE_SOURCES)
+
+    return texts
+
+
+def render_intermission_texts(
+    upcoming_runs: list[dict],
+) -> tuple[dict[str, str], list[tuple[str, str, str]]]:
+    # Returns the texts and the (runner name, name source, pronouns source) to lay out.
+    texts = {}
+    layouts = []
+
+    for position, sources in enumerate(INTERMISSION_SOURCES):
+        if position >= len(upcoming_runs):
+            texts.update((source, "") for source in sources)
+            continue
+
+        upcoming_run = upcoming_runs[position]
+        runners = upcoming_run["runners"]
+        runner_name = ", ".join(runner["name"] for runner in runners)
+        runner_pronouns = (runners[0]["pronouns"] or "") if len(runners) == 1 else ""
+
+        texts[sources[0]] = upcoming_run["name"] or ""
+        texts[sources[1]] = upcoming_run["category"] or ""
+        texts[sources[2]] = runner_name
+        texts[sources[3]] = runner_pronouns
+        texts[sources[4]] = upcoming_run["estimated_time"]
+        layouts.append((runner_name, sources[2], sources[3]))
+
+    return texts, layouts
+
+
+def scene_sources() -> dict[str, list[str]]:
+    # Text sources by scene, to lay out a stand-in OBS. Every run source goes in the run scene.
+    run_sources = [
+        *(source for sources in RUNNER_NAME_SOURCES for source in sources),
+        *(source for sources in RUNNER_PRONOUNS_SOURCES for source in sources),
+        *(source for sources in COMMENTATOR_NAME_SOURCES for source in sources),
+        *(source for sources in COMMENTATOR_PRONOUNS_SOURCES for source in sources),
+        *TITLE_SOURCES,
+        *CATEGORY_SOURCES,
+        *PLATFORM_SOURCES,
+        *ESTIMATE_SOURCES,
+        *NEXT_RUN_SOURCES,
+    ]
+
+    return {
+        "1P - 4/3": run_sources,
+        "Intermission": [source for sources in INTERMISSION_SOURCES for source in sources],
+    }
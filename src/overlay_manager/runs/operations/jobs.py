@@ -0,0 +1,67 @@
+import collections
+import logging
+import threading
+from collections.abc import Callable
+
+from django import db
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger("runs")
+
+
+# In-process job queue run by a single background worker thread. Jobs are keyed: enqueuing a job
+# while another one with the same key is still pending replaces it, so only the latest is run.
+class JobQueue:
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._pending: collections.OrderedDict[str, Callable[[], None]] = collections.OrderedDict()
+        self._worker: threading.Thread | None = None
+
+    def enqueue(self, key: str, job: Callable[[], None]) -> None:
+        if not settings.BACKGROUND_JOBS_ENABLED:
+            self._run(key, job)
+            return
+
+        with self._condition:
+            if key in self._pending:
+                logger.info("Coalesce pending job", extra={"job": key})
+            self._pending[key] = job
+            self._start_worker()
+            self._condition.notify()
+
+    def enqueue_on_commit(self, key: str, job: Callable[[], None]) -> None:
+        transaction.on_commit(lambda: self.enqueue(key, job))
+
+    def pending(self) -> list[str]:
+        with self._condition:
+            return list(self._pending)
+
+    def _start_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+
+        self._worker = threading.Thread(target=self._work, name="runs-jobs", daemon=True)
+        self._worker.start()
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                key, job = self._pending.popitem(last=False)
+
+            db.close_old_connections()
+            try:
+                self._run(key, job)
+            finally:
+                db.close_old_connections()
+
+    def _run(self, key: str, job: Callable[[], None]) -> None:
+        try:
+            job()
+        except Exception as e:
+            logger.exception("Background job failed", exc_info=e, extra={"job": key})
+
+
+queue = JobQueue()
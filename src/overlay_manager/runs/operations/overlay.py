@@ -0,0 +1,142 @@
+import asyncio
+import collections
+import contextlib
+import datetime
+import logging
+import threading
+from collections.abc import Iterator
+
+from asgiref.sync import sync_to_async
+from django import dispatch
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+
+from overlay_manager.runs import models, signals
+
+logger = logging.getLogger("runs")
+
+
+def get_event_state(event_name: str) -> dict | None:
+    version = models.EventData.get_state_version(event_name)
+    cache_key = f"event-state:{event_name}:{version}"
+
+    if (state := cache.get(cache_key)) is not None:
+        return state
+
+    if (state := build_event_state(event_name, version)) is not None:
+        cache.set(cache_key, state, settings.OVERLAY_STATE_CACHE_TIMEOUT)
+
+    return state
+
+
+def build_event_state(event_name: str, version: int) -> dict | None:
+    try:
+        event = models.EventData.objects.select_related("current_run").get(name=event_name)
+    except models.EventData.DoesNotExist:
+        return None
+
+    current_run = event.current_run
+    if current_run is not None:
+        prefetch_related_objects([current_run], "runners")
+
+    upcoming_runs = event.get_upcoming_runs()[: settings.OVERLAY_STATE_UPCOMING_RUNS]
+
+    return {
+        "event": event.name,
+        "version": version,
+        "updated_at": datetime.datetime.now(datetime.UTC).isoformat(),
+        "shift": int(event.shift.total_seconds()),
+        "current_run": current_run.to_display() if current_run else None,
+        "next_run": upcoming_runs[0] if upcoming_runs else None,
+        "upcoming_runs": upcoming_runs,
+    }
+
+
+async def wait_for_event_state(event_name: str, version: int, timeout: float) -> dict | None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    with broadcaster.subscribe(event_name) as subscription:
+        while True:
+            state = await sync_to_async(get_event_state)(event_name)
+            if state is None or state["version"] != version:
+                return state
+
+            if (remaining := deadline - loop.time()) <= 0:
+                return state
+
+            # Wake up on heartbeats as well, the change may come from another worker process.
+            await subscription.wait(min(remaining, settings.OVERLAY_STREAM_HEARTBEAT))
+
+
+def diff_state(previous_state: dict | None, state: dict | None) -> dict:
+    previous_state = previous_state or {}
+    state = state or {}
+
+    return {
+        key: state.get(key)
+        for key in previous_state.keys() | state.keys()
+        if previous_state.get(key) != state.get(key)
+    }
+
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    def notify(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._changed.set)
+        except RuntimeError:
+            # The subscriber loop is already closed, the stream is gone.
+            pass
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except TimeoutError:
+            return False
+
+        self._changed.clear()
+        return True
+
+
+class Broadcaster:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: dict[str, set[Subscription]] = collections.defaultdict(set)
+
+    @contextlib.contextmanager
+    def subscribe(self, event_name: str) -> Iterator[Subscription]:
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[event_name].add(subscription)
+
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions[event_name].discard(subscription)
+                if not self._subscriptions[event_name]:
+                    del self._subscriptions[event_name]
+
+    def publish(self, event_name: str) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(event_name, ()))
+
+        logger.debug(
+            "Publish event state change",
+            extra={"event_name": event_name, "subscribers": len(subscriptions)},
+        )
+        for subscription in subscriptions:
+            subscription.notify()
+
+
+broadcaster = Broadcaster()
+
+
+@dispatch.receiver(signals.event_state_changed)
+def _publish_event_state_changed(sender, event_name: str, **kwargs) -> None:
+    broadcaster.publish(event_name)
@@ -0,0 +1,155 @@
+import contextlib
+import dataclasses
+import logging
+import threading
+import time
+from collections.abc import Iterator
+
+from django import db
+from django.conf import settings
+from django.db.models import prefetch_related_objects
+
+from overlay_manager.runs import models
+from overlay_manager.runs.operations import overlay
+from overlay_manager.runs.operations import rtmp as rtmp_operations
+from overlay_manager.vendors.obs import client as obs_client
+
+logger = logging.getLogger("runs")
+
+
+@dataclasses.dataclass(frozen=True)
+class PreviewSource:
+    name: str
+    label: str
+
+
+@dataclasses.dataclass(frozen=True)
+class PreviewFrame:
+    source: PreviewSource
+    image: bytes
+    captured_at: float
+
+
+def get_preview_sources(event: models.EventData) -> list[PreviewSource]:
+    runs = [run for run in (event.current_run, event.next_run) if run is not None]
+    if not runs:
+        return []
+
+    prefetch_related_objects(runs, "runners")
+    sources = [
+        PreviewSource(name=run.obs_scene_id, label=run.name) for run in runs if run.obs_scene_id
+    ]
+
+    try:
+        streams = rtmp_operations.get_active_streams()
+    except rtmp_operations.CouldNotGetStats:
+        streams = []
+
+    runner_ids = {runner.id for run in runs for runner in run.runners.all()}
+    sources.extend(
+        PreviewSource(
+            name=settings.PREVIEW_WALL_STREAM_SOURCE.format(stream_id=stream.id),
+            label=stream.runner.name,
+        )
+        for stream in streams
+        if stream.runner is not None and stream.runner.id in runner_ids
+    )
+
+    return list(dict.fromkeys(sources))
+
+
+# Low-resolution frames of the current and next run sources of an event. A single producer
+# thread takes the screenshots while someone is watching, whatever the number of viewers.
+class PreviewWall:
+    def __init__(self, event_name: str) -> None:
+        self.event_name = event_name
+
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._viewers = 0
+        self._frames: dict[str, PreviewFrame] = {}
+
+    @contextlib.contextmanager
+    def watch(self) -> Iterator["PreviewWall"]:
+        with self._lock:
+            self._viewers += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._produce, name=f"preview-wall:{self.event_name}", daemon=True
+                )
+                self._thread.start()
+
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._viewers -= 1
+
+    def get_frame(self, source_name: str) -> PreviewFrame | None:
+        with self._lock:
+            return self._frames.get(source_name)
+
+    def _produce(self) -> None:
+        while True:
+            with self._lock:
+                if not self._viewers:
+                    self._thread = None
+                    self._frames = {}
+                    return
+
+            started_at = time.monotonic()
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.exception(
+                    "Failed to refresh preview wall", exc_info=e, extra={"event": self.event_name}
+                )
+            finally:
+                db.close_old_connections()
+
+            time.sleep(max(settings.PREVIEW_WALL_INTERVAL - (time.monotonic() - started_at), 0))
+
+    def refresh(self) -> None:
+        try:
+            event = models.EventData.objects.select_related("current_run").get(
+                name=self.event_name
+            )
+        except models.EventData.DoesNotExist:
+            return
+
+        obs = obs_client.ObsClient()
+        frames = {}
+        for source in get_preview_sources(event):
+            try:
+                image = obs.get_source_screen_shot(
+                    source.name,
+                    img_format="jpeg",
+                    width=settings.PREVIEW_WALL_WIDTH,
+                    quality=settings.PREVIEW_WALL_QUALITY,
+                )
+            except obs_client.ObsClientError:
+                continue
+
+            frames[source.name] = PreviewFrame(
+                source=source, image=image, captured_at=time.monotonic()
+            )
+
+        with self._lock:
+            self._frames = frames
+
+        broadcaster.publish(self.event_name)
+
+
+_walls: dict[str, PreviewWall] = {}
+_walls_lock = threading.Lock()
+
+# Viewers are woken up when new frames are available.
+broadcaster = overlay.Broadcaster()
+
+
+def get_preview_wall(event_name: str) -> PreviewWall:
+    with _walls_lock:
+        if event_name not in _walls:
+            _walls[event_name] = PreviewWall(event_name)
+
+        return _walls[event_name]
@@ -1,13 +1,23 @@
 from collections.abc import Generator
 import dataclasses
+import logging
+import threading
 import requests
 from xml.etree import ElementTree
 
+from django import db
 from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Q
 
+from overlay_manager import metrics
 from overlay_manager.runs import models
 
+logger = logging.getLogger("runs")
+
+_STREAMS_CACHE_KEY = "rtmp-active-streams"
+_POLL_LOCK_CACHE_KEY = "rtmp-active-streams-lock"
+
 
 class CouldNotGetStats(Exception):
     pass
@@ -23,21 +33,56 @@ class Stream:
         return self.id
 
 
-def get_active_streams() -> Generator[Stream, None, None]:
-    stats = _get_stats(settings.RTMP_STATS_URI)
-    et = _parse_stats(stats)
+def get_active_streams() -> list[Stream]:
+    # Streams are collected by the background poller, never on the request path.
+    poller.start()
 
-    for stream in et.findall("server/application/live/stream"):
-        stream_id = stream.find("name").text
-        stream_url = f"{settings.RTMP_BASE_URI}/{stream_id}"
-        runner_q = models.Person.objects.filter(
-            Q(rtmp_host__in=[stream_id, stream_url]) | Q(name=stream_id)
-        )
+    streams = cache.get(_STREAMS_CACHE_KEY)
+    if streams is None:
+        raise CouldNotGetStats()
 
-        try:
-            runner = runner_q.first()
-        except models.Person.DoesNotExist:
-            runner = None
+    return streams
+
+
+def collect_active_streams() -> list[Stream]:
+    with metrics.RTMP_STATS_FETCH_SECONDS.time():
+        stats = _get_stats(settings.RTMP_STATS_URI)
+
+    with metrics.RTMP_STATS_PARSE_SECONDS.time():
+        et = _parse_stats(stats)
+
+        stream_ids = [
+            stream.find("name").text for stream in et.findall("server/application/live/stream")
+        ]
+        stream_urls = {
+            stream_id: f"{settings.RTMP_BASE_URI}/{stream_id}" for stream_id in stream_ids
+        }
+        runners_by_host = {}
+        runners_by_name = {}
+
+        for person in models.Person.objects.filter(
+            Q(rtmp_host__in=[*stream_ids, *stream_urls.values()]) | Q(name__in=stream_ids)
+        ):
+            if person.rtmp_host:
+                runners_by_host[person.rtmp_host] = person
+            runners_by_name[person.name] = person
+
+        return list(_get_streams(stream_ids, stream_urls, runners_by_host, runners_by_name))
+
+
+def _get_streams(
+    stream_ids: list[str],
+    stream_urls: dict[str, str],
+    runners_by_host: dict[str, models.Person],
+    runners_by_name: dict[str, models.Person],
+) -> Generator[Stream, None, None]:
+    for stream_id in stream_ids:
+        stream_url = stream_urls[stream_id]
+        runner = (
+            runners_by_host.get(stream_id)
+            or runners_by_host.get(stream_url)
+            or runners_by_name.get(stream_id)
+        )
 
         yield Stream(
             id=stream_id,
@@ -47,7 +92,11 @@ def get_active_streams() -> Generator[Stream, None, None]:
 
 
 def _get_stats(url: str) -> str:
-    stats = requests.get(settings.RTMP_STATS_URI)
+    try:
+        stats = requests.get(url, timeout=settings.RTMP_STATS_TIMEOUT)
+    except requests.RequestException as e:
+        raise CouldNotGetStats() from e
+
     if not stats.ok:
         raise CouldNotGetStats()
 
@@ -59,3 +108,47 @@ def _parse_stats(stats: str) -> ElementTree:
         return ElementTree.fromstring(stats)
     except ElementTree.ParseError as e:
         raise CouldNotGetStats() from e
+
+
+class StatsPoller:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._poll, name="rtmp-stats", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _poll(self) -> None:
+        while not self._stop.is_set():
+            # Only one worker process refreshes the snapshot per interval.
+            if cache.add(_POLL_LOCK_CACHE_KEY, True, settings.RTMP_STATS_INTERVAL / 2):
+                self.refresh()
+
+            self._stop.wait(settings.RTMP_STATS_INTERVAL)
+
+    def refresh(self) -> None:
+        try:
+            streams = collect_active_streams()
+        except Exception as e:
+            # The previous snapshot is kept until it expires.
+            logger.exception("Failed to collect RTMP stats", exc_info=e)
+            metrics.RTMP_STATS_FAILURES.inc()
+            return
+        finally:
+            db.close_old_connections()
+
+        cache.set(_STREAMS_CACHE_KEY, streams, settings.RTMP_STATS_INTERVAL * 3)
+
+
+poller = StatsPoller()
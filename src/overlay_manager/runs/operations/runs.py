@@ -1,40 +1,125 @@
 import datetime
+import functools
 import logging
+import time
 
 from django.db import transaction
 
-from overlay_manager.runs import models
+from overlay_manager import metrics
+from overlay_manager.runs import models, obs_texts
+from overlay_manager.runs.operations import jobs
 from overlay_manager.vendors.obs import client as obs_client
 
 logger = logging.getLogger("runs")
 
 
+class CouldNotMoveRun(Exception):
+    pass
+
+
+@transaction.atomic
+def update_all_runs_for_events(event: models.EventData) -> None:
+    update_runs_from_index(event)
+
+
 @transaction.atomic
-def update_run_dates(run: models.Run) -> None:
-    if run.actual_end_at:
+def update_runs_from_index(event: models.EventData, run_index: int | None = None) -> None:
+    event.notify_state_changed()
+    event.refresh_upcoming_runs()
+    event.save(update_fields=["upcoming_runs"])
+
+    # Finished runs keep their planning, replan from the first unfinished run of the suffix.
+    unfinished_runs = event.runs.filter(actual_end_at__isnull=True)
+    if run_index is not None:
+        unfinished_runs = unfinished_runs.filter(run_index__gte=run_index)
+
+    first_run_index = (
+        unfinished_runs.order_by("run_index").values_list("run_index", flat=True).first()
+    )
+    if first_run_index is None:
         return
 
-    previous_run = (
-        models.Run.objects.filter(run_index__lt=run.run_index, event=run.event)
+    previous_end_at = (
+        event.runs.filter(run_index__lt=first_run_index)
         .order_by("-run_index")
+        .values_list("planning_end_at", flat=True)
         .first()
     )
+    start_at = previous_end_at or event.event_start_at
+    changed_runs = []
 
-    run.planning_start_at = (
-        previous_run.planning_end_at if previous_run else run.event.event_start_at
-    )
-    run.planning_end_at = run.planning_start_at + run.estimated_time
-    run.save()
+    for run in (
+        event.runs.filter(run_index__gte=first_run_index)
+        .order_by("run_index")
+        .only(
+            "id",
+            "event",
+            "run_index",
+            "estimated_time",
+            "planning_start_at",
+            "planning_end_at",
+            "actual_end_at",
+        )
+    ):
+        if run.actual_end_at:
+            start_at = run.planning_end_at
+            continue
+
+        if _plan_run(run, start_at):
+            changed_runs.append(run)
+        start_at = run.planning_end_at
+
+    models.Run.objects.bulk_update(changed_runs, ["planning_start_at", "planning_end_at"])
 
 
 @transaction.atomic
-def update_all_runs_for_events(event: models.EventData) -> None:
-    for run in event.runs.order_by("run_index"):
-        update_run_dates(run)
+def move_run(run: models.Run, position: int) -> None:
+    # The target is a 1-based position in the schedule, run indexes are sparse.
+    event = run.event
+    if position < 1:
+        raise CouldNotMoveRun()
+
+    run_index = (
+        event.runs.order_by("run_index")
+        .values_list("run_index", flat=True)[position - 1 : position]
+        .first()
+    )
+    current_run_index = event.current_run.run_index if event.current_run else 0
+    if run.is_finished or run_index is None or run_index <= current_run_index:
+        raise CouldNotMoveRun()
+
+    from_run_index = run.run_index
+    if run_index == from_run_index:
+        return
+
+    # Only the moved run is written, in the slot before (moving up) or after (moving down) the
+    # run at the target index.
+    other_runs = event.runs.exclude(id=run.id)
+    if run_index < from_run_index:
+        rebalanced = models.Run.objects.move_before(
+            run, other_runs.filter(run_index__gte=run_index).order_by("run_index").first()
+        )
+    else:
+        rebalanced = models.Run.objects.move_after(
+            run, other_runs.filter(run_index__lte=run_index).order_by("-run_index").first()
+        )
+
+    update_runs_from_index(event, None if rebalanced else min(from_run_index, run.run_index))
+
+
+def _plan_run(run: models.Run, start_at: datetime.datetime) -> bool:
+    end_at = start_at + run.estimated_time
+    if run.planning_start_at == start_at and run.planning_end_at == end_at:
+        return False
+
+    run.planning_start_at = start_at
+    run.planning_end_at = end_at
+    return True
 
 
 @transaction.atomic(durable=True)
 def next_run_for_event(event: models.EventData) -> None:
+    started_at = time.perf_counter()
     if not event.next_slot:
         logger.info(
             "No next slot for event", extra={"event": event, "current_run": event.current_run}
@@ -42,6 +127,24 @@ def next_run_for_event(event: models.EventData) -> None:
         return
 
     event.set_next_run()
+
+    transaction.on_commit(
+        lambda: metrics.RUN_TRANSITION_SECONDS.observe(time.perf_counter() - started_at)
+    )
+    # OBS is updated by the background worker once the new current run is committed, rapid
+    # transitions of the same event only apply the final state.
+    jobs.queue.enqueue_on_commit(
+        f"obs-update:{event.id}",
+        functools.partial(update_obs_for_event, event.id, transition_started_at=started_at),
+    )
+
+
+def update_obs_for_event(event_id: int, transition_started_at: float | None = None) -> None:
+    try:
+        event = models.EventData.objects.select_related("current_run").get(id=event_id)
+    except models.EventData.DoesNotExist:
+        return
+
     current_run = event.current_run
 
     if not current_run:
@@ -49,17 +152,28 @@ def next_run_for_event(event: models.EventData) -> None:
 
     try:
         obs = obs_client.ObsClient()
-        if scene_id := current_run.obs_scene_id:
-            obs.set_scene(scene_id)
-
         next_run = event.next_slot
-        if next_run and (scene_id := next_run.obs_scene_id):
-            obs.set_studio_scene(scene_id)
+        intermission_layouts = []
+
+        # Scene changes and texts are sent in one request batch, run in order by OBS without a
+        # round trip between them. The batch is not frame synchronized (that would hold every
+        # request for a frame), so OBS may render a frame between two of its requests.
+        with obs.batch():
+            if scene_id := current_run.obs_scene_id:
+                obs.set_scene(scene_id)
+
+            if next_run and (scene_id := next_run.obs_scene_id):
+                obs.set_studio_scene(scene_id)
+
+                upcoming_runs = event.get_upcoming_runs()
+                if next_run.is_intermission:
+                    intermission_layouts = _update_intermission(obs, next_run, upcoming_runs)
+                else:
+                    _update_run(obs, next_run, upcoming_runs)
 
-            if next_run.is_intermission:
-                _update_intermission(obs, next_run)
-            else:
-                _update_run(obs, next_run)
+        # Runner pronouns are positioned against the texts applied by the previous batch.
+        with obs.batch():
+            _update_intermission_layout(obs, intermission_layouts)
 
     except obs_client.ObsClientError as e:
         logger.exception(
@@ -67,73 +181,49 @@ def next_run_for_event(event: models.EventData) -> None:
             exc_info=e,
             extra={"event": event, "current_run": current_run, "next_run": event.next_run},
         )
+        metrics.OBS_UPDATE_FAILURES.inc()
+        return
 
+    if transition_started_at is not None:
+        metrics.RUN_TRANSITION_OBS_SECONDS.observe(time.perf_counter() - transition_started_at)
 
-def _update_intermission(obs: obs_client.ObsClient, run: models.Run) -> None:
-    next_runs_display = [
-        (
-            "Titre_NextRun",
-            "Categorie_NextRun",
-            "Runneureuse_1_NextRun",
-            "Runneureuse_1_Pronoms_NextRun",
-            "Estimate_NextRun",
-        ),
-        (
-            "Titre_Next",
-            "Categorie_Next",
-            "Runneureuse_1_Next",
-            "Runneureureuse_1_Pronoms_Next",
-            "Estimate_Next",
-        ),
-        (
-            "Titre_Next2",
-            "Categorie_Next2",
-            "Runneureuse_1_Next2",
-            "Runneureuse_1_Pronoms_Next2",
-            "Estimate_Next2",
-        ),
-        (
-            "Titre_Next3",
-            "Categorie_Next3",
-            "Runneureuse_1_Next3",
-            "Runneureuse_1_Pronoms_Next3",
-            "Estimate_Next3",
-        ),
-    ]
+
+def _update_intermission(
+    obs: obs_client.ObsClient, run: models.Run, upcoming_runs: list[dict]
+) -> list[tuple[str, str, str]]:
     timer_start_value = max(
         run.planning_end_at - datetime.datetime.now(datetime.UTC), run.estimated_time
     )
-    scene = "Intermission"
+    texts, layouts = obs_texts.render_intermission_texts(
+        [
+            upcoming_run
+            for upcoming_run in upcoming_runs
+            if upcoming_run["run_index"] > run.run_index
+        ]
+    )
 
-    for run, displays in zip(
-        models.Run.objects.filter(
-            is_intermission=False, run_index__gt=run.run_index, event=run.event
-        ).order_by("run_index"),
-        next_runs_display,
-    ):
+    for source_name, text in texts.items():
+        try:
+            obs.set_text_source_text(source_name, text)
+        except obs_client.ObsClientError:
+            pass
+
+    # TODO: set timer
+
+    return layouts
+
+
+def _update_intermission_layout(
+    obs: obs_client.ObsClient, layouts: list[tuple[str, str, str]]
+) -> None:
+    for runner_name, name_display, pronouns_display in layouts:
         try:
-            runner = run.runners.first()
-            runner_name = (
-                runner.name if run.runners.count() == 1 else ", ".join(r.name for r in run.runners.all())
-            )
-            runner_pronouns = runner.pronouns if run.runners.count() == 1 else ""
-
-            obs.set_text_source_text(displays[0], run.name)
-            obs.set_text_source_text(displays[1], run.category or "")
-            obs.set_text_source_text(displays[2], runner_name)
-            obs.set_text_source_text(displays[3], runner_pronouns)
-            obs.set_text_source_text(
-                displays[4],
-                f"{run.estimated_time.seconds // 3600}:"
-                f"{run.estimated_time.seconds % 3600 // 60:02}:"
-                f"{run.estimated_time.seconds % 60:02}",
-            )
             _replace_runner_elements_for_scene(
                 obs,
                 "Intermission",
-                runner,
-                displays[2],
-                displays[3],
+                runner_name,
+                name_display,
+                pronouns_display,
                 "",
                 {
                     "hide_if_too_long": True,
@@ -143,105 +233,29 @@ def _update_intermission(obs: obs_client.ObsClient, run: models.Run) -> None:
         except obs_client.ObsClientError:
             pass
 
-    # TODO: set timer
-
-
-def _update_run(obs: obs_client.ObsClient, run: models.Run):
-    runners_name_display = [
-        ["Runneureuse_1_1P_4:3", "Runneureuse_1_1P_WS", "Runneureuse_1_2P_WS"],
-        ["Runneureuse_2_2P_WS"],
-        [],
-        [],
-    ]
-    commentators_name_display = [
-        ["Commentateurice_1_1P_4:3", "Commentateurice_1_1P_WS", "Commentateurice_1_2P_WS"],
-        ["Commentateurice_2_1P_4:3", "Commentateurice_2_1P_WS", "Commentateurice_2_2P_WS"],
-    ]
-    runners_pronouns_display = [
-        [
-            "Runneureuse_1_Pronoms_1P_4:3",
-            "Runneureuse_1_Pronoms_1P_WS",
-            "Runneureuse_1_Pronoms_2P_WS",
-        ],
-        ["Runneureuse_2_Pronoms_2P_WS"],
-        [],
-        [],
-    ]
-    commentators_pronouns_display = [
-        [
-            "Commentateurice_1_Pronoms_1P_4:3",
-            "Commentateurice_1_Pronoms_1P_WS",
-            "Commentateurice_1_Pronoms_2P_WS",
-        ],
-        [
-            "Commentateurice_2_Pronoms_1P_4:3",
-            "Commentateurice_2_Pronoms_1P_WS",
-            "Commentateurice_2_Pronoms_2P_WS",
-        ],
-    ]
-    runners_socials_media_display = [
-        [],
-        [],
-        [],
-        [],
-    ]
-    run_title_displays = ["Titre_1P_WS", "Titre_1P_4:3", "Titre_4P"]
-    run_category_displays = ["Categorie_1P_WS", "Categorie_1P_4:3", "Categorie_4P"]
-    run_platform_displays = ["Support/Année_1P_WS", "Support/Année_1P_4:3", "Support/Année_4P"]
-    run_estimated_time_displays = ["Estimate"]
-    next_run_displays = []
-
-    for runner_name, runner_pronouns, runner_socials_media, runner in zip(
-        runners_name_display,
-        runners_pronouns_display,
-        runners_socials_media_display,
-        run.runners.order_by("name"),
-    ):
-        for scene in runner_name:
-            obs.set_text_source_text(scene, runner.name)
-        for scene in runner_pronouns:
-            obs.set_text_source_text(scene, runner.pronouns or "")
 
-    for commentator_name, commentator_pronouns, commentator in zip(
-        commentators_name_display, commentators_pronouns_display, run.commentators.order_by("name")
-    ):
-        for scene in commentator_name:
-            commentator_name = commentator.name
-            if commentator_name == "Personne":
-                commentator_name = ""
-            obs.set_text_source_text(scene, commentator_name)
-        for scene in commentator_pronouns:
-            obs.set_text_source_text(scene, commentator.pronouns or "")
-
-    for scene in run_title_displays:
-        obs.set_text_source_text(scene, run.name)
-    for scene in run_category_displays:
-        obs.set_text_source_text(scene, run.category or "")
-    for scene in run_platform_displays:
-        obs.set_text_source_text(scene, run.platform or "")
-    for scene in run_estimated_time_displays:
-        obs.set_text_source_text(
-            scene,
-            f"{run.estimated_time.seconds // 3600}:"
-            f"{run.estimated_time.seconds % 3600 // 60:02}:"
-            f"{run.estimated_time.seconds % 60:02}",
-        )
+def _update_run(obs: obs_client.ObsClient, run: models.Run, upcoming_runs: list[dict]):
+    for source_name, text in run.get_obs_texts().items():
+        obs.set_text_source_text(source_name, text)
 
-    next_run = (
-        run.event.runs.filter(run_index__gt=run.run_index, is_intermission=False)
-        .order_by("run_index")
-        .first()
+    next_run = next(
+        (
+            upcoming_run
+            for upcoming_run in upcoming_runs
+            if upcoming_run["run_index"] > run.run_index
+        ),
+        None,
     )
     if not next_run:
         return
-    for scene in next_run_displays:
-        obs.set_text_source_text(scene, next_run.name)
+    for scene in obs_texts.NEXT_RUN_SOURCES:
+        obs.set_text_source_text(scene, next_run["name"])
 
 
 def _replace_runner_elements_for_scene(
     obs: obs_client.ObsClient,
     scene: str,
-    runner: models.Person,
+    runner_name: str,
     name_scene_id: str,
     pronouns_scene_id: str,
     socials_media_scene_id: str,
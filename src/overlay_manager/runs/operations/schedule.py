@@ -0,0 +1,322 @@
+import csv
+import dataclasses
+import datetime
+import io
+import json
+import re
+from collections.abc import Iterable, Iterator
+
+from django.db import transaction
+from django.utils import dateparse
+
+from overlay_manager.runs import models
+from overlay_manager.runs.operations import runs as run_operations
+
+CSV_COLUMNS = [
+    "name",
+    "category",
+    "platform",
+    "estimate",
+    "runners",
+    "commentators",
+    "is_intermission",
+    "trigger_warning",
+    "obs_scene_id",
+]
+
+_PEOPLE_SEPARATOR = re.compile(r"\s*(?:,|&|;|\bvs\.?\b)\s*", re.IGNORECASE)
+_MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_HORARO_COLUMNS = {
+    "name": ("game", "run", "jeu"),
+    "category": ("category", "catégorie", "categorie"),
+    "platform": ("platform", "console", "system", "support"),
+    "runners": ("runner", "player"),
+    "commentators": ("comment", "caster"),
+}
+
+
+class CouldNotImportSchedule(Exception):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class ScheduleRow:
+    name: str
+    estimated_time: datetime.timedelta
+    category: str | None = None
+    platform: str | None = None
+    runners: tuple[str, ...] = ()
+    commentators: tuple[str, ...] = ()
+    is_intermission: bool = False
+    trigger_warning: str | None = None
+    obs_scene_id: str | None = None
+
+
+def read_schedule(content: str, schedule_format: str) -> list[ScheduleRow]:
+    if schedule_format == "csv":
+        return list(parse_csv(io.StringIO(content)))
+    if schedule_format == "json":
+        try:
+            return list(parse_json(json.loads(content)))
+        except json.JSONDecodeError as e:
+            raise CouldNotImportSchedule(str(e)) from e
+
+    raise CouldNotImportSchedule(f"Unknown schedule format {schedule_format}")
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[ScheduleRow]:
+    for line, row in enumerate(csv.DictReader(lines), start=2):
+        try:
+            yield _parse_row(row)
+        except (KeyError, ValueError) as e:
+            raise CouldNotImportSchedule(f"Invalid row on line {line}: {e}") from e
+
+
+def parse_json(data: dict | list) -> Iterator[ScheduleRow]:
+    try:
+        if isinstance(data, list):
+            yield from (_parse_row(row) for row in data)
+        elif "lines" in data:
+            yield from _parse_oengus(data["lines"])
+        elif "schedule" in data:
+            yield from _parse_horaro(data["schedule"])
+        else:
+            raise CouldNotImportSchedule("Unknown JSON schedule layout")
+    except (KeyError, TypeError, ValueError) as e:
+        raise CouldNotImportSchedule(f"Invalid schedule: {e}") from e
+
+
+@transaction.atomic
+def import_schedule(
+    event_name: str,
+    rows: list[ScheduleRow],
+    event_start_at: datetime.datetime | None = None,
+    replace: bool = False,
+) -> models.EventData:
+    try:
+        event = models.EventData.objects.select_for_update().get(name=event_name)
+    except models.EventData.DoesNotExist:
+        if event_start_at is None:
+            raise CouldNotImportSchedule(f"Event {event_name} does not exist, a start is needed")
+        event = models.EventData.objects.create(
+            name=event_name, event_start_at=event_start_at, event_end_at=event_start_at
+        )
+
+    if event_start_at is not None and event.event_start_at != event_start_at:
+        event.event_start_at = event_start_at
+        event.save(update_fields=["event_start_at"])
+
+    if replace:
+        # The current run is deleted too, the database nulls the event's reference.
+        event.runs.all().delete()
+        event.current_run = None
+
+    persons = _get_or_create_persons(
+        list(dict.fromkeys(name for row in rows for name in (*row.runners, *row.commentators)))
+    )
+    first_run_index = models.Run.objects.append_index(event)
+    runs = models.Run.objects.bulk_create(
+        models.Run(
+            event=event,
+            run_index=first_run_index + position * models.RUN_INDEX_GAP,
+            name=row.name,
+            category=row.category,
+            platform=row.platform,
+            trigger_warning=row.trigger_warning,
+            obs_scene_id=row.obs_scene_id,
+            is_intermission=row.is_intermission,
+            estimated_time=row.estimated_time,
+            planning_start_at=event.event_start_at,
+            planning_end_at=event.event_start_at,
+        )
+        for position, row in enumerate(rows)
+    )
+
+    models.Run.runners.through.objects.bulk_create(
+        models.Run.runners.through(run_id=run.id, person_id=persons[name].id)
+        for run, row in zip(runs, rows)
+        for name in dict.fromkeys(row.runners)
+    )
+    models.Run.commentators.through.objects.bulk_create(
+        models.Run.commentators.through(run_id=run.id, person_id=persons[name].id)
+        for run, row in zip(runs, rows)
+        for name in dict.fromkeys(row.commentators)
+    )
+
+    models.Run.objects.refresh_obs_texts(runs)
+    run_operations.update_runs_from_index(event, None if replace else first_run_index)
+
+    if (
+        last_end_at := event.runs.order_by("-run_index")
+        .values_list("planning_end_at", flat=True)
+        .first()
+    ):
+        event.event_end_at = max(event.event_end_at, last_end_at)
+        event.save(update_fields=["event_end_at"])
+
+    return event
+
+
+def export_schedule_csv(event: models.EventData) -> Iterator[str]:
+    buffer = _LineBuffer()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+
+    yield writer.writeheader()
+    for run in _iter_runs(event):
+        yield writer.writerow(
+            {
+                "name": run.name,
+                "category": run.category,
+                "platform": run.platform,
+                "estimate": models.format_duration(run.estimated_time),
+                "runners": ", ".join(person.name for person in run.runners.all()),
+                "commentators": ", ".join(person.name for person in run.commentators.all()),
+                "is_intermission": int(run.is_intermission),
+                "trigger_warning": run.trigger_warning,
+                "obs_scene_id": run.obs_scene_id,
+            }
+        )
+
+
+def export_schedule_json(event: models.EventData) -> Iterator[str]:
+    yield "["
+    for position, run in enumerate(_iter_runs(event)):
+        row = {
+            "name": run.name,
+            "category": run.category,
+            "platform": run.platform,
+            "estimate": models.format_duration(run.estimated_time),
+            "runners": [person.name for person in run.runners.all()],
+            "commentators": [person.name for person in run.commentators.all()],
+            "is_intermission": run.is_intermission,
+            "trigger_warning": run.trigger_warning,
+            "obs_scene_id": run.obs_scene_id,
+            "planning_start_at": run.planning_start_at.isoformat(),
+            "planning_end_at": run.planning_end_at.isoformat(),
+        }
+        yield ("," if position else "") + json.dumps(row)
+    yield "]"
+
+
+class _LineBuffer:
+    def write(self, value: str) -> str:
+        return value
+
+
+def _iter_runs(event: models.EventData) -> Iterator[models.Run]:
+    return (
+        event.runs.order_by("run_index")
+        .prefetch_related("runners", "commentators")
+        .iterator(chunk_size=500)
+    )
+
+
+def _get_or_create_persons(names: list[str]) -> dict[str, models.Person]:
+    persons = {person.name: person for person in models.Person.objects.filter(name__in=names)}
+    # Created in schedule order, so runners are listed back in the imported order.
+    if missing := [name for name in names if name not in persons]:
+        models.Person.objects.bulk_create(
+            (models.Person(name=name) for name in missing), ignore_conflicts=True
+        )
+        persons.update(
+            (person.name, person) for person in models.Person.objects.filter(name__in=missing)
+        )
+
+    return persons
+
+
+def _parse_row(row: dict) -> ScheduleRow:
+    return ScheduleRow(
+        name=row["name"],
+        estimated_time=_parse_duration(row["estimate"]),
+        category=row.get("category") or None,
+        platform=row.get("platform") or None,
+        runners=_parse_people(row.get("runners")),
+        commentators=_parse_people(row.get("commentators")),
+        is_intermission=_parse_bool(row.get("is_intermission")),
+        trigger_warning=row.get("trigger_warning") or None,
+        obs_scene_id=row.get("obs_scene_id") or None,
+    )
+
+
+def _parse_oengus(lines: list[dict]) -> Iterator[ScheduleRow]:
+    for line in lines:
+        if line.get("setupBlock"):
+            yield ScheduleRow(
+                name=line.get("setupBlockText") or "Setup",
+                estimated_time=_parse_duration(line["estimate"]),
+                is_intermission=True,
+            )
+            continue
+
+        yield ScheduleRow(
+            name=line["gameName"],
+            estimated_time=_parse_duration(line["estimate"]),
+            category=line.get("categoryName") or None,
+            platform=line.get("console") or None,
+            runners=tuple(
+                runner.get("displayName") or runner["username"]
+                for runner in line.get("runners", [])
+            ),
+        )
+
+
+def _parse_horaro(schedule: dict) -> Iterator[ScheduleRow]:
+    columns = {}
+    for position, column in enumerate(schedule["columns"]):
+        for field, keywords in _HORARO_COLUMNS.items():
+            if field not in columns and any(key in column.lower() for key in keywords):
+                columns[field] = position
+                break
+
+    if "name" not in columns:
+        raise CouldNotImportSchedule("No game column in the Horaro schedule")
+
+    for item in schedule["items"]:
+        data = item["data"]
+
+        def cell(field: str) -> str | None:
+            if field not in columns or columns[field] >= len(data) or not data[columns[field]]:
+                return None
+            return _MARKDOWN_LINK.sub(r"\1", data[columns[field]]).strip()
+
+        yield ScheduleRow(
+            name=cell("name") or "",
+            estimated_time=datetime.timedelta(seconds=item["length_t"]),
+            category=cell("category"),
+            platform=cell("platform"),
+            runners=_parse_people(cell("runners")),
+            commentators=_parse_people(cell("commentators")),
+        )
+
+
+def _parse_duration(value: str | int | float | None) -> datetime.timedelta:
+    if isinstance(value, (int, float)):
+        return datetime.timedelta(seconds=value)
+    # Empty JSON values and cells missing from short CSV rows.
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid estimate {value!r}")
+
+    if value.strip().isdigit():
+        return datetime.timedelta(seconds=int(value))
+
+    if (duration := dateparse.parse_duration(value.strip())) is None:
+        raise ValueError(f"Invalid estimate {value!r}")
+
+    return duration
+
+
+def _parse_people(value: str | list | None) -> tuple[str, ...]:
+    if not value:
+        return ()
+    if isinstance(value, list):
+        return tuple(name.strip() for name in value if name.strip())
+
+    return tuple(name for name in _PEOPLE_SEPARATOR.split(value) if name)
+
+
+def _parse_bool(value: str | bool | None) -> bool:
+    if isinstance(value, bool):
+        return value
+
+    return (value or "").strip().lower() in ("1", "true", "yes", "x")
@@ -0,0 +1,4 @@
+from django import dispatch
+
+# Sent once the transaction changing an event current or next run is committed.
+event_state_changed = dispatch.Signal()
@@ -0,0 +1,91 @@
+import datetime
+from unittest import mock
+
+from django import test, urls
+from django.contrib.auth import models as auth_models
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from overlay_manager.runs import models
+from overlay_manager.runs.operations import rtmp as rtmp_operations
+
+_START_AT = datetime.datetime(2026, 1, 1, tzinfo=datetime.UTC)
+
+
+def create_event(name: str, run_count: int) -> models.EventData:
+    event = models.EventData.objects.create(
+        name=name,
+        event_start_at=_START_AT,
+        event_end_at=_START_AT + datetime.timedelta(days=3),
+    )
+    people = models.Person.objects.bulk_create(
+        models.Person(name=f"{name}-person-{i}", pronouns="they/them") for i in range(20)
+    )
+    runs = models.Run.objects.bulk_create(
+        models.Run(
+            name=f"Run {i}",
+            category="Any%",
+            platform="PC",
+            estimated_time=datetime.timedelta(minutes=30),
+            planning_start_at=_START_AT + datetime.timedelta(minutes=30 * i),
+            planning_end_at=_START_AT + datetime.timedelta(minutes=30 * (i + 1)),
+            event=event,
+            run_index=(i + 1) * models.RUN_INDEX_GAP,
+            is_intermission=i % 5 == 4,
+        )
+        for i in range(run_count)
+    )
+    models.Run.runners.through.objects.bulk_create(
+        models.Run.runners.through(run=run, person=people[(i + offset) % len(people)])
+        for i, run in enumerate(runs)
+        for offset in range(2)
+    )
+    models.Run.commentators.through.objects.bulk_create(
+        models.Run.commentators.through(run=run, person=people[(i + 5) % len(people)])
+        for i, run in enumerate(runs)
+    )
+    event.current_run = runs[0]
+    event.save(update_fields=["current_run"])
+
+    return event
+
+
+@mock.patch.object(rtmp_operations, "get_active_streams", return_value=[])
+class EventEditViewTestCase(test.TestCase):
+    def get_details(self, event: models.EventData) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(urls.reverse("event-details", args=[event.name]))
+
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_the_schedule(self, get_active_streams):
+        small_event = create_event("small", 20)
+        large_event = create_event("large", 200)
+        # Warm up the per process caches (content types, state versions...).
+        self.get_details(small_event)
+
+        query_count = self.get_details(small_event)
+        with self.assertNumQueries(query_count):
+            self.get_details(large_event)
+
+
+@mock.patch.object(rtmp_operations, "get_active_streams", return_value=[])
+class EditRunPreviousViewTestCase(test.TestCase):
+    def setUp(self) -> None:
+        user = auth_models.User.objects.create_user("editor")
+        user.user_permissions.add(auth_models.Permission.objects.get(codename="change_eventdata"))
+        self.client.force_login(user)
+
+    def test_move_before_current_run(self, get_active_streams):
+        # The run after the current one takes its place and leaves the upcoming runs.
+        event = create_event("event", 4)
+        run = event.runs.get(name="Run 1")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(urls.reverse("edit-run-move-up", args=[event.name, run.id]))
+
+        self.assertEqual(response.status_code, 302)
+        event.refresh_from_db()
+        self.assertEqual(event.current_run, run)
+        self.assertEqual([run["name"] for run in event.upcoming_runs], ["Run 0", "Run 2", "Run 3"])
@@ -0,0 +1,52 @@
+import socket
+
+from django import test
+
+from overlay_manager.vendors.obs import fake_server
+
+
+class FakeObsServerTestCase(test.SimpleTestCase):
+    def setUp(self) -> None:
+        self.server = fake_server.FakeObsServer(scenes={"Scene": ["Text"]})
+        self.port = self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def connect(self) -> socket.socket:
+        client = socket.create_connection(("127.0.0.1", self.port), timeout=5)
+        self.addCleanup(client.close)
+        return client
+
+    def assert_serving(self) -> None:
+        client = self.connect()
+        client.sendall(
+            b"GET / HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n\r\n"
+        )
+        self.assertTrue(client.recv(1024).startswith(b"HTTP/1.1 101"))
+
+    def test_start_on_used_port(self):
+        server = fake_server.FakeObsServer(port=self.port)
+
+        with self.assertRaises(OSError):
+            server.start()
+        server.stop()
+
+    def test_bad_client_messages(self):
+        # Errors escaping the connection handler are logged by asyncio.
+        self.enterContext(self.assertNoLogs("asyncio", "ERROR"))
+        for message in (b"\x81\x08not json", b"\x81\x02{}", b"\x81\x02[]"):
+            with self.subTest(message=message):
+                client = self.connect()
+                client.sendall(b"GET / HTTP/1.1\r\nSec-WebSocket-Key: a2V5\r\n\r\n" + message)
+                client.recv(1024)
+                # The server drops the connection.
+                while client.recv(1024):
+                    pass
+
+        # Handshake over the stream reader limit.
+        client = self.connect()
+        client.sendall(b"GET / HTTP/1.1\r\n" + b"x" * 100_000)
+        while client.recv(1024):
+            pass
+
+        self.assert_serving()
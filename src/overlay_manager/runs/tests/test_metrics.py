@@ -0,0 +1,36 @@
+from unittest import mock
+
+from django import test, urls
+
+from overlay_manager import metrics
+from overlay_manager.runs.operations import rtmp as rtmp_operations
+from overlay_manager.runs.tests.test_event_views import create_event
+
+
+def get_observations(histogram: metrics.Histogram, view: str) -> tuple[float, int]:
+    _, total, count = histogram._values.get((view,), (None, 0.0, 0))
+    return total, count
+
+
+@mock.patch.object(rtmp_operations, "get_active_streams", return_value=[])
+class MetricsMiddlewareTestCase(test.TestCase):
+    def setUp(self) -> None:
+        self.event = create_event("event", 5)
+
+    def assert_queries_recorded(self, response) -> None:
+        self.assertEqual(response.status_code, 200)
+        queries, count = get_observations(metrics.VIEW_DB_QUERIES, "event-details")
+        self.assertEqual(count, self.count + 1)
+        self.assertGreater(queries, self.queries)
+
+    def test_sync_view(self, get_active_streams):
+        self.queries, self.count = get_observations(metrics.VIEW_DB_QUERIES, "event-details")
+        self.assert_queries_recorded(
+            self.client.get(urls.reverse("event-details", args=[self.event.name]))
+        )
+
+    async def test_sync_view_under_asgi(self, get_active_streams):
+        self.queries, self.count = get_observations(metrics.VIEW_DB_QUERIES, "event-details")
+        self.assert_queries_recorded(
+            await self.async_client.get(urls.reverse("event-details", args=[self.event.name]))
+        )
@@ -0,0 +1,77 @@
+from django import test
+from django.test import override_settings
+
+from overlay_manager.runs import models, obs_texts
+from overlay_manager.runs.operations import overlay as overlay_operations
+from overlay_manager.runs.tests.test_event_views import create_event
+
+
+class EventChangedTestCase(test.TestCase):
+    def setUp(self) -> None:
+        self.event = create_event("event", 4)
+        self.event.refresh_upcoming_runs()
+        self.event.save(update_fields=["upcoming_runs"])
+
+    def get_upcoming_runs(self) -> list[dict]:
+        self.event.refresh_from_db()
+        return self.event.upcoming_runs
+
+    def test_run_saved(self):
+        run = self.event.runs.get(name="Run 1")
+        version = models.EventData.get_state_version(self.event.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            run.name = "Renamed run"
+            run.save()
+
+        self.assertEqual(self.get_upcoming_runs()[0]["name"], "Renamed run")
+        self.assertNotEqual(models.EventData.get_state_version(self.event.name), version)
+
+    def test_runner_renamed(self):
+        person = self.event.runs.get(name="Run 1").runners.order_by("id").first()
+        version = models.EventData.get_state_version(self.event.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            person.name = "Renamed runner"
+            person.save()
+
+        self.assertIn(
+            "Renamed runner",
+            [runner["name"] for runner in self.get_upcoming_runs()[0]["runners"]],
+        )
+        self.assertNotEqual(models.EventData.get_state_version(self.event.name), version)
+
+    def test_run_deleted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.runs.get(name="Run 1").delete()
+
+        self.assertEqual([run["name"] for run in self.get_upcoming_runs()], ["Run 2", "Run 3"])
+
+    def test_runner_deleted(self):
+        run = self.event.runs.get(name="Run 1")
+        person = run.runners.order_by("id").first()
+        run.obs_texts = run.render_obs_texts()
+        run.save(update_fields=["obs_texts"])
+        version = models.EventData.get_state_version(self.event.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            person.delete()
+
+        run.refresh_from_db()
+        self.assertIsNone(run.obs_texts)
+        self.assertNotIn(
+            person.name, [runner["name"] for runner in self.get_upcoming_runs()[0]["runners"]]
+        )
+        self.assertNotEqual(models.EventData.get_state_version(self.event.name), version)
+
+
+class UpcomingRunsTestCase(test.TestCase):
+    @override_settings(OVERLAY_STATE_UPCOMING_RUNS=1)
+    def test_window_fills_intermission_texts(self):
+        event = create_event("event", 10)
+        event.refresh_upcoming_runs()
+        event.save(update_fields=["upcoming_runs"])
+
+        texts, _ = obs_texts.render_intermission_texts(event.upcoming_runs)
+        self.assertTrue(all(texts[sources[0]] for sources in obs_texts.INTERMISSION_SOURCES))
+        self.assertEqual(len(overlay_operations.get_event_state(event.name)["upcoming_runs"]), 1)
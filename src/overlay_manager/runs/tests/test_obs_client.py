@@ -0,0 +1,158 @@
+import socket
+import time
+from unittest import mock
+
+from django import test
+from django.test import override_settings
+
+from overlay_manager.vendors.obs import client as obs_client
+from overlay_manager.vendors.obs import (
+    connection,
+    events,
+    fake_server,
+    inputs,
+    scene_index,
+    screenshots,
+)
+
+
+def get_closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ObsClientTestCase(test.SimpleTestCase):
+    def setUp(self) -> None:
+        self.server = fake_server.FakeObsServer(scenes={"Scene": ["Text", "Other text"]})
+        self.port = self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def make_client(self, listen: bool = True) -> obs_client.ObsClient:
+        # A client with its own OBS session and caches, instead of the process wide ones.
+        obs_connection = connection.ObsConnection("127.0.0.1", self.port, "", 5.0)
+        self.addCleanup(obs_connection.close)
+        listener = events.ObsEventListener(
+            "127.0.0.1", self.port if listen else get_closed_port(), "", 5.0
+        )
+        self.mirror = inputs.InputMirror(listener)
+        if not listen:
+            # The connection failure is logged by obsws-python and the listener.
+            with self.assertLogs(level="ERROR"):
+                listener.listen()
+        self.addCleanup(lambda: listener._events and listener._events.disconnect())
+
+        with (
+            mock.patch.object(connection, "get_connection", return_value=obs_connection),
+            mock.patch.object(inputs, "get_input_mirror", return_value=self.mirror),
+            mock.patch.object(
+                scene_index,
+                "get_scene_item_index",
+                return_value=scene_index.SceneItemIndex(listener),
+            ),
+            mock.patch.object(
+                screenshots,
+                "get_screenshot_cache",
+                return_value=screenshots.ScreenshotCache(),
+            ),
+        ):
+            return obs_client.ObsClient()
+
+    def get_writes(self) -> list[dict]:
+        return [
+            request.request_data
+            for request in self.server.requests
+            if request.request_type == "SetInputSettings"
+        ]
+
+    def transition(self, client: obs_client.ObsClient, text: str) -> None:
+        with client.batch():
+            client.set_text_source_text("Text", text)
+            client.set_text_source_text("Other text", text.upper())
+
+    def wait_for(self, condition) -> None:
+        deadline = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_batch(self):
+        client = self.make_client()
+
+        self.transition(client, "run")
+
+        self.assertEqual(self.server.round_trips, 1)
+        self.assertEqual(len({request.batch_id for request in self.server.requests}), 1)
+        self.assertEqual(self.server.inputs["Text"]["text"], "run")
+        self.assertEqual(self.server.inputs["Other text"]["text"], "RUN")
+
+    def test_repeated_transition_skips_unchanged_writes(self):
+        client = self.make_client()
+
+        self.transition(client, "run")
+        self.transition(client, "run")
+        with client.batch():
+            client.set_text_source_text("Text", "run")
+            client.set_text_source_text("Other text", "NEXT")
+
+        self.assertEqual(
+            [(write["inputName"], write["inputSettings"]) for write in self.get_writes()],
+            [
+                ("Text", {"text": "run"}),
+                ("Other text", {"text": "RUN"}),
+                ("Other text", {"text": "NEXT"}),
+            ],
+        )
+
+    def test_change_from_another_client(self):
+        client = self.make_client()
+        self.transition(client, "run")
+
+        other_connection = connection.ObsConnection("127.0.0.1", self.port, "", 5.0)
+        self.addCleanup(other_connection.close)
+        other_connection.request("set_input_settings", "Text", {"text": "edited"}, True)
+        self.wait_for(lambda: not self.mirror.is_current("Text", {"text": "run"}))
+
+        self.transition(client, "run")
+
+        self.assertEqual(self.server.inputs["Text"]["text"], "run")
+        self.assertEqual(len(self.get_writes()), 4)
+
+    def test_failed_write_forgets_input(self):
+        client = self.make_client(listen=False)
+        self.transition(client, "run")
+
+        self.server.failing_requests = {"SetInputSettings"}
+        with self.assertLogs("obs", "WARNING"):
+            self.transition(client, "next")
+        self.assertFalse(self.mirror.is_current("Text", {"text": "run"}))
+
+        self.server.failing_requests = set()
+        self.transition(client, "run")
+        self.assertEqual(self.server.inputs["Text"]["text"], "run")
+
+    def test_listener_down(self):
+        # Without OBS events (the listener cannot connect), written settings are trusted for
+        # OBS_INPUT_MIRROR_TTL.
+        client = self.make_client(listen=False)
+
+        self.transition(client, "run")
+        self.transition(client, "run")
+        self.assertEqual(len(self.get_writes()), 2)
+
+        with override_settings(OBS_INPUT_MIRROR_TTL=0):
+            self.transition(client, "run")
+        self.assertEqual(len(self.get_writes()), 4)
+
+    def test_reconnect(self):
+        client = self.make_client(listen=False)
+        self.transition(client, "run")
+
+        # e.g. OBS restarted, the request is sent again on a new session.
+        self.server.drop_connections()
+        with self.assertLogs("obs", "WARNING") as logs:
+            self.transition(client, "next")
+        self.assertIn("OBS connection lost", logs.output[0])
+
+        self.assertEqual(self.server.inputs["Text"]["text"], "next")
+        self.assertEqual(client.get_connection_stats().connects, 2)
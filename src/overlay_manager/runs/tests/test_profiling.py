@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django import test, urls
+from django.contrib.auth import models as auth_models
+
+from overlay_manager import profiling
+from overlay_manager.runs.operations import rtmp as rtmp_operations
+from overlay_manager.runs.tests.test_event_views import create_event
+
+
+@mock.patch.object(rtmp_operations, "get_active_streams", return_value=[])
+class ProfilingMiddlewareTestCase(test.TestCase):
+    def setUp(self) -> None:
+        self.event = create_event("event", 5)
+        self.user = auth_models.User.objects.create_user("editor")
+        profiling.get_profile_store().clear()
+
+    def allow_profiling(self) -> None:
+        self.user.user_permissions.add(
+            auth_models.Permission.objects.get(codename="change_eventdata")
+        )
+
+    def assert_profiled(self, response) -> None:
+        self.assertEqual(response.status_code, 200)
+        profile = profiling.get_profile_store().get(response[f"{profiling.HEADER}-Id"])
+        self.assertEqual(profile.view, "event-details")
+        self.assertTrue(profile.sql_queries)
+        self.assertTrue(profile.call_tree)
+
+    def test_sync_view(self, get_active_streams):
+        self.allow_profiling()
+        self.client.force_login(self.user)
+
+        self.assert_profiled(
+            self.client.get(
+                urls.reverse("event-details", args=[self.event.name]),
+                {profiling.QUERY_FLAG: "1"},
+            )
+        )
+
+    async def test_sync_view_under_asgi(self, get_active_streams):
+        await self.async_client.aforce_login(self.user)
+        url = urls.reverse("event-details", args=[self.event.name])
+
+        response = await self.async_client.get(url, {profiling.QUERY_FLAG: "1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(f"{profiling.HEADER}-Id", response)
+
+        await self.user.user_permissions.aadd(
+            await auth_models.Permission.objects.aget(codename="change_eventdata")
+        )
+        self.assert_profiled(await self.async_client.get(url, headers={profiling.HEADER: "1"}))
+
+    def test_one_profile_at_a_time(self, get_active_streams):
+        self.allow_profiling()
+        self.client.force_login(self.user)
+
+        with profiling._profiler_lock:
+            response = self.client.get(
+                urls.reverse("event-details", args=[self.event.name]),
+                {profiling.QUERY_FLAG: "1"},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(f"{profiling.HEADER}-Id", response)
@@ -0,0 +1,97 @@
+import datetime
+
+from django import test
+
+from overlay_manager.runs import models
+from overlay_manager.runs.operations import runs as run_operations
+from overlay_manager.runs.tests.test_event_views import create_event
+
+
+class MoveRunTestCase(test.TestCase):
+    def setUp(self) -> None:
+        # Runs 0 to 5, with sparse run indexes and run 0 as the current run.
+        self.event = create_event("event", 6)
+
+    def get_names(self) -> list[str]:
+        return list(self.event.runs.order_by("run_index").values_list("name", flat=True))
+
+    def test_move_to_position(self):
+        run = self.event.runs.get(name="Run 4")
+        run_operations.move_run(run, 2)
+        self.assertEqual(self.get_names(), ["Run 0", "Run 4", "Run 1", "Run 2", "Run 3", "Run 5"])
+
+        run.refresh_from_db()
+        run_operations.move_run(run, 6)
+        self.assertEqual(self.get_names(), ["Run 0", "Run 1", "Run 2", "Run 3", "Run 5", "Run 4"])
+
+    def test_move_out_of_schedule(self):
+        run = self.event.runs.get(name="Run 4")
+        for position in (0, 1, 7):
+            with self.assertRaises(run_operations.CouldNotMoveRun):
+                run_operations.move_run(run, position)
+
+
+class UpdateRunsFromIndexTestCase(test.TestCase):
+    def setUp(self) -> None:
+        # Runs 0 to 5 of 30 minutes, planned back to back from the event start.
+        self.event = create_event("event", 6)
+        self.runs = list(self.event.runs.order_by("run_index"))
+
+    def get_planning(self) -> list[tuple[datetime.datetime, datetime.datetime]]:
+        return list(
+            self.event.runs.order_by("run_index").values_list(
+                "planning_start_at", "planning_end_at"
+            )
+        )
+
+    def set_estimate(self, run: models.Run, minutes: int) -> None:
+        run.estimated_time = datetime.timedelta(minutes=minutes)
+        run.save(update_fields=["estimated_time"])
+
+    def test_replan_suffix(self):
+        before = self.get_planning()
+        self.set_estimate(self.runs[2], 60)
+
+        run_operations.update_runs_from_index(self.event, self.runs[2].run_index)
+
+        planning = self.get_planning()
+        self.assertEqual(planning[:2], before[:2])
+        start_at = before[1][1]
+        for (planning_start_at, planning_end_at), minutes in zip(planning[2:], (60, 30, 30, 30)):
+            self.assertEqual(planning_start_at, start_at)
+            self.assertEqual(planning_end_at, start_at + datetime.timedelta(minutes=minutes))
+            start_at = planning_end_at
+
+    def test_replan_from_previous_run_end(self):
+        # The suffix starts where the previous run is planned to end, not on the event start.
+        self.runs[1].planning_end_at += datetime.timedelta(minutes=15)
+        self.runs[1].save(update_fields=["planning_end_at"])
+
+        run_operations.update_runs_from_index(self.event, self.runs[2].run_index)
+
+        self.assertEqual(self.get_planning()[2][0], self.runs[1].planning_end_at)
+
+    def test_skip_finished_runs(self):
+        finished_run = self.runs[3]
+        finished_run.actual_start_at = finished_run.planning_start_at
+        finished_run.actual_end_at = finished_run.planning_end_at
+        finished_run.save(update_fields=["actual_start_at", "actual_end_at"])
+        before = self.get_planning()
+        self.set_estimate(self.runs[2], 60)
+        self.set_estimate(finished_run, 60)
+
+        run_operations.update_runs_from_index(self.event, self.runs[2].run_index)
+
+        planning = self.get_planning()
+        self.assertEqual(planning[3], before[3])
+        self.assertEqual(planning[4][0], before[3][1])
+
+    def test_matches_full_replan(self):
+        for run, minutes in zip(self.runs[3:], (10, 45, 20)):
+            self.set_estimate(run, minutes)
+
+        run_operations.update_runs_from_index(self.event, self.runs[3].run_index)
+        planning = self.get_planning()
+        run_operations.update_runs_from_index(self.event)
+
+        self.assertEqual(self.get_planning(), planning)
@@ -0,0 +1,46 @@
+import datetime
+
+from django import test
+
+from overlay_manager.runs import models
+from overlay_manager.runs.operations import schedule as schedule_operations
+from overlay_manager.runs.tests.test_event_views import create_event
+
+
+class ImportScheduleTestCase(test.TestCase):
+    def test_replace_live_event(self):
+        # Run 0 is the current run, it is deleted with the rest of the schedule.
+        event = create_event("event", 5)
+        rows = [
+            schedule_operations.ScheduleRow(
+                name=f"New run {i}",
+                estimated_time=datetime.timedelta(minutes=20),
+                runners=("Runner",),
+            )
+            for i in range(3)
+        ]
+
+        event = schedule_operations.import_schedule(event.name, rows, replace=True)
+
+        self.assertIsNone(event.current_run)
+        event = models.EventData.objects.get(id=event.id)
+        self.assertIsNone(event.current_run)
+        self.assertEqual(
+            list(event.runs.order_by("run_index").values_list("name", flat=True)),
+            ["New run 0", "New run 1", "New run 2"],
+        )
+        self.assertEqual(
+            [run["name"] for run in event.get_upcoming_runs()],
+            ["New run 0", "New run 1", "New run 2"],
+        )
+
+
+class ReadScheduleTestCase(test.SimpleTestCase):
+    def test_missing_estimate(self):
+        for content, schedule_format in (
+            ("name,estimate\nGame\n", "csv"),
+            ('[{"name": "Game", "estimate": null}]', "json"),
+        ):
+            with self.subTest(schedule_format=schedule_format):
+                with self.assertRaises(schedule_operations.CouldNotImportSchedule):
+                    schedule_operations.read_schedule(content, schedule_format)
@@ -1,6 +1,7 @@
 from .css import CSSView
 from .event import (
     DefaultEventRedirectView,
+    EditRunMoveView,
     EditRunNextView,
     EditRunPreviousView,
     EventEditFormView,
@@ -8,6 +9,10 @@ from .event import (
     MoveNextRunView,
     MovePreviousRunView,
 )
+from .metrics import MetricsView
+from .obs import ObsHealthView
+from .preview import PreviewStreamView, PreviewWallView
+from .profiling import ProfileDetailView, ProfileListView
 from .runs import (
     CurrentRunCategoryView,
     CurrentRunEstimateView,
@@ -18,6 +23,9 @@ from .runs import (
     CurrentRunnerView,
     CurrentRunPlatformView,
     CurrentRunTriggerWarning,
+    EventStateView,
     NextRunView,
 )
 from .sceenshot import ScreenshotView
+from .schedule import ScheduleExportView, ScheduleImportView
+from .stream import EventStateStreamView
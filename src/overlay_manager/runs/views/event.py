@@ -3,7 +3,7 @@ import datetime
 from django import http, urls
 from django.contrib.auth import mixins as auth_mixins
 from django.db import transaction
-from django.db.models import Max
+from django.db.models import Max, prefetch_related_objects
 from django.views import generic
 
 from overlay_manager.runs import forms, models
@@ -22,7 +22,7 @@ class EventEditView(generic.DetailView):
             queryset = self.model.objects
 
         try:
-            self.event = queryset.get(name=self.kwargs["event_name"])
+            self.event = queryset.select_related("current_run").get(name=self.kwargs["event_name"])
             return self.event
         except self.model.DoesNotExist:
             raise http.Http404()
@@ -30,9 +30,19 @@ class EventEditView(generic.DetailView):
     def get_context_data(self, **kwargs) -> dict:
         ctx = super().get_context_data(**kwargs)
         ctx["event"] = self.event
-        ctx["current_run"] = self.event.current_run
-        ctx["next_run"] = self.event.next_run
-        ctx["runs"] = self.event.runs.filter(is_intermission=False).filter(is_finished=False).order_by("run_index")
+        ctx["current_run"] = current_run = self.event.current_run
+        ctx["next_run"] = next_run = self.event.next_run
+        prefetch_related_objects(
+            [run for run in (current_run, next_run) if run], "runners", "commentators"
+        )
+        # Runs loaded through the event relation share the event instance, so `start_at` does
+        # not query the event shift again for each row.
+        ctx["runs"] = (
+            self.event.runs.filter(is_intermission=False)
+            .filter(is_finished=False)
+            .order_by("run_index")
+            .prefetch_related("runners", "commentators")
+        )
         late = ""
         if late_seconds := self.event.shift.total_seconds():
             hours = int(late_seconds // 3600)
@@ -113,7 +123,7 @@ class EditRunPreviousView(auth_mixins.PermissionRequiredMixin, generic.DetailVie
             queryset = self.model.objects
 
         try:
-            selected_run = queryset.get(id=self.kwargs["run_id"])
+            selected_run = queryset.select_related("event").get(id=self.kwargs["run_id"])
             previous_run = (
                 selected_run.event.runs.filter(run_index__lt=selected_run.run_index)
                 .order_by("-run_index")
@@ -133,18 +143,15 @@ class EditRunPreviousView(auth_mixins.PermissionRequiredMixin, generic.DetailVie
                 urls.reverse("event-edit", kwargs={"event_name": selected_run.event.name})
             )
 
-        previous_run_index = previous_run.run_index
-        previous_run.run_index = -1
-        previous_run.save()
-        selected_run.run_index = previous_run_index
-        selected_run.save()
-        previous_run.run_index = selected_run.run_index + 1
-        previous_run.save()
-        run_operations.update_all_runs_for_events(selected_run.event)
+        rebalanced = models.Run.objects.move_before(selected_run, previous_run)
+        # The upcoming runs are refreshed from the new current run.
+        if previous_run.id == selected_run.event.current_run_id:
+            selected_run.event.current_run = selected_run
+            selected_run.event.save(update_fields=["current_run"])
 
-        if previous_run == previous_run.event.current_run:
-            previous_run.event.current_run = selected_run
-            previous_run.event.save()
+        run_operations.update_runs_from_index(
+            selected_run.event, None if rebalanced else selected_run.run_index
+        )
 
         return http.HttpResponseRedirect(
             urls.reverse("event-edit", kwargs={"event_name": selected_run.event.name})
@@ -160,7 +167,7 @@ class EditRunNextView(auth_mixins.PermissionRequiredMixin, generic.DetailView):
             queryset = self.model.objects
 
         try:
-            selected_run = queryset.get(id=self.kwargs["run_id"])
+            selected_run = queryset.select_related("event").get(id=self.kwargs["run_id"])
             next_run = (
                 selected_run.event.runs.filter(run_index__gt=selected_run.run_index)
                 .order_by("run_index")
@@ -180,56 +187,105 @@ class EditRunNextView(auth_mixins.PermissionRequiredMixin, generic.DetailView):
                 urls.reverse("event-edit", kwargs={"event_name": selected_run.event.name})
             )
 
-        next_run_index = next_run.run_index
-        next_run.run_index = -1
-        next_run.save()
-        selected_run.run_index = next_run_index
-        selected_run.save()
-        next_run.run_index = selected_run.run_index - 1
-        next_run.save()
-        run_operations.update_all_runs_for_events(selected_run.event)
+        rebalanced = models.Run.objects.move_after(selected_run, next_run)
+        run_operations.update_runs_from_index(
+            selected_run.event, None if rebalanced else next_run.run_index
+        )
 
         return http.HttpResponseRedirect(
             urls.reverse("event-edit", kwargs={"event_name": selected_run.event.name})
         )
 
 
+class EditRunMoveView(auth_mixins.PermissionRequiredMixin, generic.DetailView):
+    model = models.Run
+    permission_required = "runs.change_eventdata"
+
+    def get_object(self, queryset=None, **kwargs) -> models.Run:
+        if not queryset:
+            queryset = self.model.objects
+
+        try:
+            return queryset.select_related("event", "event__current_run").get(
+                id=self.kwargs["run_id"], event__name=self.kwargs["event_name"]
+            )
+        except self.model.DoesNotExist:
+            raise http.Http404()
+
+    def get(self, request, *args, **kwargs) -> http.HttpResponse:
+        if "position" not in self.kwargs:
+            return http.HttpResponseNotAllowed(["POST"])
+
+        run = self.get_object()
+
+        try:
+            run_operations.move_run(run, self.kwargs["position"])
+        except run_operations.CouldNotMoveRun:
+            return http.HttpResponseBadRequest()
+
+        return http.HttpResponseRedirect(
+            urls.reverse("event-edit", kwargs={"event_name": run.event.name})
+        )
+
+    def post(self, request, *args, **kwargs) -> http.HttpResponse:
+        # Drag and drop from the schedule editor, the target position is posted.
+        run = self.get_object()
+
+        try:
+            run_operations.move_run(run, int(request.POST["position"]))
+        except (KeyError, ValueError, run_operations.CouldNotMoveRun):
+            return http.HttpResponseBadRequest()
+
+        return http.HttpResponse(status=204)
+
+
 class EventEditFormView(auth_mixins.PermissionRequiredMixin, generic.FormView):
     permission_required = "runs.change_eventdata"
     form_class = forms.EventForm
     model = models.EventData
     template_name = "event/edit.html"
 
+    event: models.EventData | None = None
+
     def get_object(self, queryset=None, **kwargs) -> models.EventData:
+        if self.event is not None:
+            return self.event
+
         if not queryset:
             queryset = self.model.objects
 
         try:
-            return queryset.get(name=self.kwargs["event_name"])
+            self.event = queryset.select_related("current_run").get(name=self.kwargs["event_name"])
+            return self.event
         except self.model.DoesNotExist:
             raise http.Http404()
 
     def get_context_data(self, **kwargs) -> dict:
         ctx = super().get_context_data(**kwargs)
         event = self.get_object()
+        current_run_index = event.current_run.run_index if event.current_run else 0
+        max_run_index = event.runs.aggregate(Max("run_index"))["run_index__max"]
         ctx["event"] = event
         ctx["runs"] = [
             {
                 "id": run.id,
+                "position": position,
+                "run_index": run.run_index,
                 "name": run.name,
                 "estimated_time": run.estimated_time,
                 "planning_start_at": run.planning_start_at,
                 "planning_end_at": run.planning_end_at,
-                "runners": run.runners.all(),
-                "commentators": run.commentators.all(),
+                "runners": list(run.runners.all()),
+                "commentators": list(run.commentators.all()),
                 "is_intermission": run.is_intermission,
                 "is_finished": run.is_finished,
-                "can_move_up": run.run_index > event.current_run.run_index,
-                "can_move_down": run.run_index
-                < event.runs.aggregate(Max("run_index"))["run_index__max"]
-                and not run.is_finished,
+                "can_move_up": run.run_index > current_run_index,
+                "can_move_down": run.run_index < max_run_index and not run.is_finished,
             }
-            for run in event.runs.order_by("run_index")
+            for position, run in enumerate(
+                event.runs.order_by("run_index").prefetch_related("runners", "commentators"),
+                start=1,
+            )
         ]
         try:
             streams = rtmp_operations.get_active_streams()
@@ -0,0 +1,27 @@
+import secrets
+
+from django import http
+from django.conf import settings
+from django.contrib.auth import mixins as auth_mixins
+from django.views import generic
+
+from overlay_manager import metrics
+
+
+class MetricsView(auth_mixins.PermissionRequiredMixin, generic.View):
+    permission_required = "runs.view_eventdata"
+
+    def has_permission(self) -> bool:
+        # Scrapers authenticate with the metrics token instead of a session.
+        authorization = self.request.headers.get("Authorization", "")
+        if settings.METRICS_TOKEN and secrets.compare_digest(
+            authorization, f"Bearer {settings.METRICS_TOKEN}"
+        ):
+            return True
+
+        return super().has_permission()
+
+    def get(self, request, *args, **kwargs) -> http.HttpResponse:
+        return http.HttpResponse(
+            metrics.registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
@@ -0,0 +1,18 @@
+import attrs
+from django import http
+from django.contrib.auth import mixins as auth_mixins
+from django.views import generic
+
+from overlay_manager.vendors.obs import client
+
+
+class ObsHealthView(auth_mixins.PermissionRequiredMixin, generic.View):
+    permission_required = "runs.view_eventdata"
+
+    def get(self, request, *args, **kwargs) -> http.HttpResponse:
+        stats = client.ObsClient().get_connection_stats()
+
+        return http.JsonResponse(
+            {**attrs.asdict(stats), "average_latency": stats.average_latency},
+            status=200 if stats.connected or not stats.connection_failures else 503,
+        )
@@ -0,0 +1,76 @@
+from collections.abc import AsyncIterator
+
+from asgiref.sync import sync_to_async
+from django import http
+from django.conf import settings
+from django.contrib.auth import mixins as auth_mixins
+from django.views import generic
+
+from overlay_manager.runs import models
+from overlay_manager.runs.operations import preview as preview_operations
+
+_BOUNDARY = "frame"
+
+
+class PreviewWallView(auth_mixins.PermissionRequiredMixin, generic.TemplateView):
+    permission_required = "runs.view_eventdata"
+    template_name = "event/preview.html"
+
+    def get_context_data(self, **kwargs) -> dict:
+        ctx = super().get_context_data(**kwargs)
+        try:
+            event = models.EventData.objects.select_related("current_run").get(
+                name=self.kwargs["event_name"]
+            )
+        except models.EventData.DoesNotExist:
+            raise http.Http404()
+
+        ctx["event"] = event
+        ctx["sources"] = preview_operations.get_preview_sources(event)
+        return ctx
+
+
+class PreviewStreamView(generic.View):
+    async def get(self, request, *args, **kwargs) -> http.StreamingHttpResponse:
+        user = await request.auser()
+        if not await sync_to_async(user.has_perm)("runs.view_eventdata"):
+            return http.HttpResponseForbidden()
+
+        if not (source_name := request.GET.get("source")):
+            return http.HttpResponseBadRequest()
+
+        event_name = self.kwargs["event_name"]
+        if not await models.EventData.objects.filter(name=event_name).aexists():
+            raise http.Http404()
+
+        response = http.StreamingHttpResponse(
+            self._stream(event_name, source_name),
+            content_type=f"multipart/x-mixed-replace; boundary={_BOUNDARY}",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def _stream(self, event_name: str, source_name: str) -> AsyncIterator[bytes]:
+        wall = preview_operations.get_preview_wall(event_name)
+        sent_at = None
+
+        with (
+            wall.watch(),
+            preview_operations.broadcaster.subscribe(event_name) as subscription,
+        ):
+            while True:
+                frame = wall.get_frame(source_name)
+                if frame is not None and frame.captured_at != sent_at:
+                    sent_at = frame.captured_at
+                    yield _format_part(frame.image)
+
+                await subscription.wait(settings.OVERLAY_STREAM_HEARTBEAT)
+
+
+def _format_part(image: bytes) -> bytes:
+    return (
+        f"--{_BOUNDARY}\r\n"
+        f"Content-Type: image/jpeg\r\n"
+        f"Content-Length: {len(image)}\r\n\r\n".encode() + image + b"\r\n"
+    )
@@ -0,0 +1,30 @@
+from django import http
+from django.conf import settings
+from django.contrib.auth import mixins as auth_mixins
+from django.views import generic
+
+from overlay_manager import profiling
+
+
+class ProfileListView(auth_mixins.PermissionRequiredMixin, generic.TemplateView):
+    permission_required = profiling.PERMISSION
+    template_name = "profiling/list.html"
+
+    def get_context_data(self, **kwargs) -> dict:
+        ctx = super().get_context_data(**kwargs)
+        ctx["profiles"] = profiling.get_profile_store().list()
+        ctx["history"] = settings.PROFILING_HISTORY
+        return ctx
+
+
+class ProfileDetailView(auth_mixins.PermissionRequiredMixin, generic.TemplateView):
+    permission_required = profiling.PERMISSION
+    template_name = "profiling/details.html"
+
+    def get_context_data(self, **kwargs) -> dict:
+        ctx = super().get_context_data(**kwargs)
+        if (profile := profiling.get_profile_store().get(self.kwargs["profile_id"])) is None:
+            raise http.Http404()
+
+        ctx["profile"] = profile
+        return ctx
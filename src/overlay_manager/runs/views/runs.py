@@ -1,21 +1,76 @@
+import datetime
+
+from asgiref.sync import sync_to_async
 from django import http
+from django.conf import settings
+from django.utils import cache as cache_utils
+from django.utils import http as http_utils
 from django.views import generic
 
-from overlay_manager.runs import models
+from overlay_manager.runs.operations import overlay
 
 
-class CurrentRunView(generic.DetailView):
-    model = models.EventData
+class EventStateView(generic.View):
+    async def get(self, request, *args, **kwargs) -> http.HttpResponse:
+        event_name = self.kwargs["event_name"]
 
-    def get_object(self, queryset=None, **kwargs) -> models.Run:
-        if not queryset:
-            queryset = self.model.objects
+        if since := request.GET.get("since"):
+            try:
+                since = int(since)
+            except ValueError:
+                return http.HttpResponseBadRequest()
 
-        try:
-            return queryset.get(name=self.kwargs["event_name"]).current_run
-        except self.model.DoesNotExist:
+            state = await overlay.wait_for_event_state(
+                event_name, since, settings.OVERLAY_LONG_POLL_TIMEOUT
+            )
+        else:
+            state = await sync_to_async(overlay.get_event_state)(event_name)
+
+        if state is None:
             raise http.Http404()
 
+        if since == state["version"]:
+            # Long poll timed out without any change.
+            response = http.HttpResponseNotModified()
+            _set_state_validators(response, state)
+            return response
+
+        etag, last_modified = _get_state_validators(state)
+        if response := cache_utils.get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        ):
+            return response
+
+        response = http.JsonResponse(state)
+        _set_state_validators(response, state)
+        return response
+
+
+class CurrentRunView(generic.DetailView):
+    state: dict | None = None
+
+    def get(self, request, *args, **kwargs) -> http.HttpResponse:
+        etag, last_modified = _get_state_validators(self.get_state())
+        if response := cache_utils.get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        ):
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        _set_state_validators(response, self.get_state())
+        return response
+
+    def get_state(self) -> dict:
+        if self.state is None:
+            self.state = overlay.get_event_state(self.kwargs["event_name"])
+            if self.state is None:
+                raise http.Http404()
+
+        return self.state
+
+    def get_object(self, queryset=None, **kwargs) -> dict | None:
+        return self.get_state()["current_run"]
+
 
 class CurrentRunNameView(CurrentRunView):
     template_name = "current/run_name.html"
@@ -38,12 +93,13 @@ class CurrentRunTriggerWarning(CurrentRunView):
 
 
 class CurrentRunnerView(CurrentRunView):
-    def get_object(self, queryset=None, **kwargs) -> models.Person:
+    def get_object(self, queryset=None, **kwargs) -> dict:
         run = super().get_object()
-        runners = [r for r in run.runners.all().order_by("id")]
+        if run is None:
+            raise http.Http404()
 
         try:
-            return runners[self.kwargs["index"]]
+            return run["runners"][self.kwargs["index"]]
         except IndexError:
             raise http.Http404()
 
@@ -63,25 +119,27 @@ class CurrentRunnerNameAndPronounsView(CurrentRunnerView):
 class NextRunView(CurrentRunView):
     template_name = "next/run.html"
 
-    def get_object(self, queryset=None, **kwargs) -> models.Run | None:
-        if not queryset:
-            queryset = self.model.objects
-
-        try:
-            event = queryset.get(name=self.kwargs["event_name"])
-            return (
-                event.runs.filter(
-                    run_index__gt=event.current_run.run_index,
-                    is_intermission=False,
-                )
-                .prefetch_related("runners")
-                .first()
-            )
-        except self.model.DoesNotExist:
-            return None
+    def get_object(self, queryset=None, **kwargs) -> dict | None:
+        return self.get_state()["next_run"]
 
     def get_context_data(self, **kwargs) -> dict:
         ctx = super().get_context_data(**kwargs)
-        ctx["runners"] = self.object.runners.all().order_by("id")
+        ctx["runners"] = (
+            [runner["name"] for runner in self.object["runners"]] if self.object else []
+        )
 
         return ctx
+
+
+def _get_state_validators(state: dict) -> tuple[str, int]:
+    etag = f'"{state["version"]}"'
+    last_modified = int(datetime.datetime.fromisoformat(state["updated_at"]).timestamp())
+
+    return etag, last_modified
+
+
+def _set_state_validators(response: http.HttpResponse, state: dict) -> None:
+    etag, last_modified = _get_state_validators(state)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_utils.http_date(last_modified)
+    response["Cache-Control"] = "no-cache"
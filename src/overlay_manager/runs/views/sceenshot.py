@@ -1,4 +1,5 @@
 from django import http
+from django.conf import settings
 from django.contrib.auth import mixins as auth_mixins
 from django.views import generic
 
@@ -6,17 +7,44 @@ from overlay_manager.vendors.obs import client
 
 from .runs import CurrentRunView
 
+CONTENT_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+}
+
 
 class ScreenshotView(auth_mixins.PermissionRequiredMixin, CurrentRunView):
-    content_type = "image/png"
     permission_required = "runs.view_eventdata"
 
     def get(self, request, *args, **kwargs) -> http.HttpResponse:
+        img_format = request.GET.get("format", settings.OBS_SCREENSHOT_FORMAT)
+        if img_format not in CONTENT_TYPES:
+            return http.HttpResponseBadRequest()
+
+        try:
+            width = int(request.GET.get("width", settings.OBS_SCREENSHOT_WIDTH))
+        except ValueError:
+            return http.HttpResponseBadRequest()
+        # OBS accepts scaled screenshots between 8 and 4096 pixels wide.
+        width = min(max(width, 8), settings.OBS_SCREENSHOT_MAX_WIDTH)
+
         run = self.get_object()
+        if run is None:
+            raise http.Http404()
+
         obs = client.ObsClient()
 
         try:
-            img = obs.get_source_screen_shot(run.obs_scene_id)
-            return http.HttpResponse(img, content_type=self.content_type)
+            img = obs.get_source_screen_shot(
+                run["obs_scene_id"],
+                img_format=img_format,
+                width=width,
+                quality=settings.OBS_SCREENSHOT_QUALITY,
+            )
         except client.ObsClientError:
             return http.HttpResponseNotFound()
+
+        response = http.HttpResponse(img, content_type=CONTENT_TYPES[img_format])
+        response["Cache-Control"] = f"private, max-age={int(settings.OBS_SCREENSHOT_CACHE_TTL)}"
+        return response
@@ -0,0 +1,67 @@
+from django import http, urls
+from django.contrib.auth import mixins as auth_mixins
+from django.views import generic
+
+from overlay_manager.runs import forms, models
+from overlay_manager.runs.operations import schedule as schedule_operations
+
+
+class ScheduleImportView(auth_mixins.PermissionRequiredMixin, generic.FormView):
+    permission_required = "runs.change_eventdata"
+    form_class = forms.ScheduleImportForm
+    template_name = "event/import.html"
+
+    def get_object(self) -> models.EventData:
+        try:
+            return models.EventData.objects.get(name=self.kwargs["event_name"])
+        except models.EventData.DoesNotExist:
+            raise http.Http404()
+
+    def get_context_data(self, **kwargs) -> dict:
+        ctx = super().get_context_data(**kwargs)
+        ctx["event"] = self.get_object()
+        return ctx
+
+    def get_success_url(self) -> str:
+        return urls.reverse("event-edit", kwargs={"event_name": self.kwargs["event_name"]})
+
+    def form_valid(self, form) -> http.HttpResponse:
+        event = self.get_object()
+
+        try:
+            content = form.cleaned_data["schedule"].read().decode("utf-8-sig")
+            rows = schedule_operations.read_schedule(content, form.cleaned_data["format"])
+            schedule_operations.import_schedule(
+                event.name, rows, replace=form.cleaned_data["replace"]
+            )
+        except UnicodeDecodeError:
+            form.add_error("schedule", "The schedule must be UTF-8 encoded")
+            return self.form_invalid(form)
+        except schedule_operations.CouldNotImportSchedule as e:
+            form.add_error("schedule", str(e))
+            return self.form_invalid(form)
+
+        return super().form_valid(form)
+
+
+class ScheduleExportView(auth_mixins.PermissionRequiredMixin, generic.View):
+    permission_required = "runs.change_eventdata"
+
+    def get(self, request, *args, **kwargs) -> http.StreamingHttpResponse:
+        try:
+            event = models.EventData.objects.get(name=self.kwargs["event_name"])
+        except models.EventData.DoesNotExist:
+            raise http.Http404()
+
+        if request.GET.get("format") == "json":
+            lines = schedule_operations.export_schedule_json(event)
+            content_type, extension = "application/json", "json"
+        else:
+            lines = schedule_operations.export_schedule_csv(event)
+            content_type, extension = "text/csv", "csv"
+
+        return http.StreamingHttpResponse(
+            lines,
+            content_type=content_type,
+            headers={"Content-Disposition": f'attachment; filename="{event.name}.{extension}"'},
+        )
@@ -0,0 +1,44 @@
+import json
+from collections.abc import AsyncIterator
+
+from asgiref.sync import sync_to_async
+from django import http
+from django.conf import settings
+from django.views import generic
+
+from overlay_manager.runs.operations import overlay
+
+
+class EventStateStreamView(generic.View):
+    async def get(self, request, *args, **kwargs) -> http.StreamingHttpResponse:
+        event_name = self.kwargs["event_name"]
+        state = await sync_to_async(overlay.get_event_state)(event_name)
+        if state is None:
+            raise http.Http404()
+
+        response = http.StreamingHttpResponse(
+            self._stream(event_name, state), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def _stream(self, event_name: str, state: dict) -> AsyncIterator[str]:
+        yield _format_message("state", state)
+
+        with overlay.broadcaster.subscribe(event_name) as subscription:
+            while True:
+                # Without notification, the state is checked again on each heartbeat so that
+                # changes committed by another worker process are still pushed.
+                changed = await subscription.wait(settings.OVERLAY_STREAM_HEARTBEAT)
+                new_state = await sync_to_async(overlay.get_event_state)(event_name)
+
+                if diff := overlay.diff_state(state, new_state):
+                    state = new_state
+                    yield _format_message("diff", diff)
+                elif not changed:
+                    yield ": keep-alive\n\n"
+
+
+def _format_message(event: str, data: dict | None) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
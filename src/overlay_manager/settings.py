@@ -58,6 +58,8 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
+    "overlay_manager.metrics.MetricsMiddleware",
+    "overlay_manager.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "overlay_manager.urls"
@@ -164,8 +166,57 @@ SOCIALACCOUNT_PROVIDERS = {
 OBS_HOST = env.str("OBS_HOST", "localhost")
 OBS_PORT = env.int("OBS_PORT", 4455)
 OBS_PASSWORD = env.str("OBS_PASSWORD", "")
+OBS_TIMEOUT = env.float("OBS_TIMEOUT", 5.0)
+OBS_RECONNECT_BACKOFF_MIN = env.float("OBS_RECONNECT_BACKOFF_MIN", 0.5)
+OBS_RECONNECT_BACKOFF_MAX = env.float("OBS_RECONNECT_BACKOFF_MAX", 30.0)
+OBS_SCENE_ITEM_CACHE_TTL = env.float("OBS_SCENE_ITEM_CACHE_TTL", 60.0)
+# How long the last known input settings are trusted while OBS events are not received.
+OBS_INPUT_MIRROR_TTL = env.float("OBS_INPUT_MIRROR_TTL", 60.0)
+OBS_SCREENSHOT_CACHE_TTL = env.float("OBS_SCREENSHOT_CACHE_TTL", 1.5)
+OBS_SCREENSHOT_FORMAT = env.str("OBS_SCREENSHOT_FORMAT", "jpeg")
+OBS_SCREENSHOT_WIDTH = env.int("OBS_SCREENSHOT_WIDTH", 640)
+OBS_SCREENSHOT_MAX_WIDTH = env.int("OBS_SCREENSHOT_MAX_WIDTH", 1920)
+OBS_SCREENSHOT_QUALITY = env.int("OBS_SCREENSHOT_QUALITY", 75)
+
+# Cache
+# Event state versions are shared through the cache, every worker process must see the same
+# backend: the default database cache (table created by the runs migrations), memcached or redis.
+CACHES = {
+    "default": {
+        "BACKEND": env.str("CACHE_BACKEND", "django.core.cache.backends.db.DatabaseCache"),
+        "LOCATION": env.str("CACHE_LOCATION", "overlay_manager_cache"),
+    }
+}
+
+# Background jobs
+# When disabled, jobs (e.g. OBS updates) run synchronously right after the transaction commit.
+BACKGROUND_JOBS_ENABLED = env.bool("BACKGROUND_JOBS_ENABLED", True)
+
+# Overlays
+OVERLAY_STREAM_HEARTBEAT = env.float("OVERLAY_STREAM_HEARTBEAT", 15.0)
+OVERLAY_LONG_POLL_TIMEOUT = env.float("OVERLAY_LONG_POLL_TIMEOUT", 30.0)
+OVERLAY_STATE_CACHE_TIMEOUT = env.int("OVERLAY_STATE_CACHE_TIMEOUT", 3600)
+OVERLAY_STATE_UPCOMING_RUNS = env.int("OVERLAY_STATE_UPCOMING_RUNS", 4)
+
+# Preview wall
+# OBS media sources showing the runner feeds are named after their RTMP stream id.
+PREVIEW_WALL_STREAM_SOURCE = env.str("PREVIEW_WALL_STREAM_SOURCE", "{stream_id}")
+PREVIEW_WALL_INTERVAL = env.float("PREVIEW_WALL_INTERVAL", 2.0)
+PREVIEW_WALL_WIDTH = env.int("PREVIEW_WALL_WIDTH", 320)
+PREVIEW_WALL_QUALITY = env.int("PREVIEW_WALL_QUALITY", 50)
 
 # RTMP
 RTMP_DOMAIN_NAME = env.str("RTMP_DOMAIN_NAME", "rtmp1.fastandfabs.run")
 RTMP_BASE_URI = f"rtmp://{RTMP_DOMAIN_NAME}/live"
 RTMP_STATS_URI = f"http://{RTMP_DOMAIN_NAME}/stat"
+RTMP_STATS_TIMEOUT = env.float("RTMP_STATS_TIMEOUT", 2.0)
+RTMP_STATS_INTERVAL = env.float("RTMP_STATS_INTERVAL", 5.0)
+
+# Metrics
+# Bearer token of the /metrics scrapers, users allowed to view events need none.
+METRICS_TOKEN = env.str("METRICS_TOKEN", "")
+
+# Profiling
+# Requests sent with ?_profile=1 or an X-Profile header by users allowed to edit events are
+# profiled, the last ones are listed on /profiles.
+PROFILING_HISTORY = env.int("PROFILING_HISTORY", 50)
@@ -55,6 +55,17 @@ urlpatterns = [
         views.NextRunView.as_view(),
         name="next-run",
     ),
+    # Overlay state
+    urls.path(
+        "event/<str:event_name>/state.json",
+        views.EventStateView.as_view(),
+        name="event-state",
+    ),
+    urls.path(
+        "event/<str:event_name>/stream",
+        views.EventStateStreamView.as_view(),
+        name="event-state-stream",
+    ),
     # Event Management
     urls.path(
         "event/<str:event_name>/details",
@@ -89,6 +100,26 @@ urlpatterns = [
         views.EditRunNextView.as_view(),
         name="edit-run-move-down",
     ),
+    urls.path(
+        "event/<str:event_name>/edit/run/<int:run_id>/move-to/<int:position>",
+        views.EditRunMoveView.as_view(),
+        name="edit-run-move-to",
+    ),
+    urls.path(
+        "event/<str:event_name>/edit/run/<int:run_id>/move",
+        views.EditRunMoveView.as_view(),
+        name="edit-run-move",
+    ),
+    urls.path(
+        "event/<str:event_name>/edit/import",
+        views.ScheduleImportView.as_view(),
+        name="event-schedule-import",
+    ),
+    urls.path(
+        "event/<str:event_name>/export",
+        views.ScheduleExportView.as_view(),
+        name="event-schedule-export",
+    ),
     # CSS Quick and dirty fix
     urls.path(
         "main.css",
@@ -101,4 +132,37 @@ urlpatterns = [
         views.ScreenshotView.as_view(),
         name="screenshot",
     ),
+    urls.path(
+        "event/<str:event_name>/preview",
+        views.PreviewWallView.as_view(),
+        name="event-preview",
+    ),
+    urls.path(
+        "event/<str:event_name>/preview/stream",
+        views.PreviewStreamView.as_view(),
+        name="event-preview-stream",
+    ),
+    # OBS
+    urls.path(
+        "obs/health",
+        views.ObsHealthView.as_view(),
+        name="obs-health",
+    ),
+    # Metrics
+    urls.path(
+        "metrics",
+        views.MetricsView.as_view(),
+        name="metrics",
+    ),
+    # Profiling
+    urls.path(
+        "profiles",
+        views.ProfileListView.as_view(),
+        name="profiles",
+    ),
+    urls.path(
+        "profiles/<str:profile_id>",
+        views.ProfileDetailView.as_view(),
+        name="profile-details",
+    ),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
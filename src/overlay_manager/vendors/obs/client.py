@@ -1,11 +1,14 @@
+import contextlib
 import logging
 import os
 import uuid
 import base64
+from collections.abc import Iterator
 
 import attrs
-import obsws_python as obs
-from django.conf import settings
+
+from overlay_manager import metrics
+from overlay_manager.vendors.obs import connection, inputs, scene_index, screenshots
 
 logger = logging.getLogger("obs")
 
@@ -37,19 +40,131 @@ class SourcePosition:
     width: float
 
 
+@attrs.define
+class BatchRequest:
+    request_type: str
+    request_data: dict
+
+
+@attrs.define
+class BatchResult:
+    request_type: str
+    ok: bool
+    code: int
+    comment: str | None = None
+    response_data: dict | None = None
+
+
+@attrs.define
+class ObsBatch:
+    requests: list[BatchRequest] = attrs.Factory(list)
+    results: list[BatchResult] = attrs.Factory(list)
+
+    @property
+    def failed(self) -> list[BatchResult]:
+        return [result for result in self.results if not result.ok]
+
+
 class ObsClient:
     def __init__(self) -> None:
-        self._host = settings.OBS_HOST
-        self._port = settings.OBS_PORT
-        self._password = settings.OBS_PASSWORD
-        self._ws = obs.ReqClient(host=self._host, port=self._port, password=self._password)
+        self._connection = connection.get_connection()
+        self._scene_items = scene_index.get_scene_item_index()
+        self._inputs = inputs.get_input_mirror()
+        self._screenshots = screenshots.get_screenshot_cache()
+        self._batch: ObsBatch | None = None
+
+    # Write requests made inside the block are sent to OBS as a single RequestBatch on exit,
+    # nested blocks are merged into the outermost one.
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[ObsBatch]:
+        if self._batch is not None:
+            yield self._batch
+            return
+
+        batch = self._batch = ObsBatch()
+        try:
+            yield batch
+        finally:
+            self._batch = None
+
+        if not batch.requests:
+            return
+
+        try:
+            results = self._connection.request_batch(
+                [
+                    {"requestType": request.request_type, "requestData": request.request_data}
+                    for request in batch.requests
+                ]
+            )
+            logger.info("Sent OBS request batch.", extra={"requests": len(batch.requests)})
+        except Exception as e:
+            logger.exception("Failed to send request batch", exc_info=e)
+            metrics.OBS_CLIENT_ERRORS.inc(operation="batch")
+            for request in batch.requests:
+                self._sent(request.request_type, request.request_data, ok=False)
+            raise ObsClientError() from e
+
+        batch.results = [
+            BatchResult(
+                request_type=result["requestType"],
+                ok=result["requestStatus"]["result"],
+                code=result["requestStatus"]["code"],
+                comment=result["requestStatus"].get("comment"),
+                response_data=result.get("responseData"),
+            )
+            for result in results
+        ]
+        for request, result in zip(batch.requests, batch.results):
+            self._sent(request.request_type, request.request_data, ok=result.ok)
+        for result in batch.failed:
+            logger.warning("OBS batched request failed.", extra={"result": result})
+            metrics.OBS_BATCHED_REQUEST_FAILURES.inc(request_type=result.request_type)
+
+    def _send(self, request_type: str, request_data: dict) -> None:
+        if self._batch is not None:
+            self._batch.requests.append(BatchRequest(request_type, request_data))
+            return
+
+        try:
+            self._connection.request("send", request_type, request_data)
+        except Exception:
+            self._sent(request_type, request_data, ok=False)
+            raise
+        self._sent(request_type, request_data, ok=True)
+
+    def _sent(self, request_type: str, request_data: dict, ok: bool) -> None:
+        if request_type != "SetInputSettings":
+            return
+
+        # The input state is unknown after a failed write.
+        if ok:
+            self._inputs.update(request_data["inputName"], request_data["inputSettings"])
+        else:
+            self._inputs.forget(request_data["inputName"])
+
+    def _set_input_settings(self, input_name: str, input_settings: dict) -> bool:
+        # Returns whether the settings were sent, they are not when OBS already has them.
+        if self._inputs.is_current(input_name, input_settings):
+            metrics.OBS_INPUT_UPDATES_SKIPPED.inc()
+            return False
+
+        self._send(
+            "SetInputSettings",
+            {"inputName": input_name, "inputSettings": input_settings, "overlay": True},
+        )
+        return True
+
+    def get_connection_stats(self) -> connection.ConnectionStats:
+        return self._connection.stats()
 
     def get_current_scene(self) -> str:
         try:
-            response = self._ws.get_current_program_scene()
+            response = self._connection.request("get_current_program_scene")
             logger.info("Got OBS current scene.", extra=response.__dict__)
         except Exception as e:
             logger.exception("Failed to get current scene", exc_info=e)
+            metrics.OBS_CLIENT_ERRORS.inc(operation="get_current_scene")
             # raise ObsClientError() from e
             return ""
 
@@ -57,51 +172,55 @@ class ObsClient:
 
     def set_scene(self, scene_name: str) -> None:
         try:
-            self._ws.set_current_program_scene(scene_name)
+            self._send("SetCurrentProgramScene", {"sceneName": scene_name})
             logger.info("Set OBS scene.", extra={"scene_name": scene_name})
         except Exception as e:
             logger.exception("Failed to set scene", exc_info=e)
+            metrics.OBS_CLIENT_ERRORS.inc(operation="set_scene")
             # raise ObsClientError() from e
 
     def set_studio_scene(self, scene_name: str) -> None:
         try:
-            self._ws.set_studio_mode_enabled(True)
-            self._ws.set_current_preview_scene(scene_name)
+            self._send("SetStudioModeEnabled", {"studioModeEnabled": True})
+            self._send("SetCurrentPreviewScene", {"sceneName": scene_name})
             logger.info("Set OBS studio scene.", extra={"scene_name": scene_name})
         except Exception as e:
             logger.exception("Failed to set studio scene", exc_info=e)
+            metrics.OBS_CLIENT_ERRORS.inc(operation="set_studio_scene")
             # raise ObsClientError() from e
 
     def get_all_scenes(self) -> list[str]:
         try:
-            response = self._ws.get_scene_list()
+            response = self._connection.request("get_scene_list")
             logger.info("Got OBS scenes.", extra=response.__dict__)
         except Exception as e:
             logger.exception("Failed to get scenes", exc_info=e)
+            metrics.OBS_CLIENT_ERRORS.inc(operation="get_all_scenes")
             raise ObsClientError() from e
 
         return [scene["sceneName"] for scene in response.scenes]
 
     def set_text_source_text(self, source_name: str, text: str) -> None:
         try:
-            self._ws.set_input_settings(
-                name=source_name,
-                settings={"text": text},
-                overlay=True,
-            )
+            if not self._set_input_settings(source_name, {"text": text}):
+                return
+
+            self._scene_items.source_changed(source_name)
             logger.info(
                 "Set OBS text source text.", extra={"source_name": source_name, "text": text}
             )
         except Exception as e:
             logger.exception("Failed to set text source text", exc_info=e)
+            metrics.OBS_CLIENT_ERRORS.inc(operation="set_text_source_text")
             # raise ObsClientError() from e
 
     def get_scene_sources(self, scene_name: str) -> list:
         try:
-            response = self._ws.get_scene_item_list(scene_name)
+            response = self._connection.request("get_scene_item_list", scene_name)
             logger.info("Got OBS scene sources.", extra=response.__dict__)
         except Exception as e:
             logger.exception("Failed to get scene sources", exc_info=e)
+            metrics.OBS_CLIENT_ERRORS.inc(operation="get_scene_sources")
             # raise ObsClientError() from e
             return []
 
@@ -110,30 +229,41 @@ class ObsClient:
     def get_scene_source_position(
         self, scene_name: str, source_name: str
     ) -> SourcePosition | None:
-        for source in self.get_scene_sources(scene_name):
-            if source["sourceName"] == source_name:
-                return SourcePosition(
-                    scene_id=scene_name,
-                    scene_item_id=source["sceneItemId"],
-                    alignment=source["sceneItemTransform"]["alignment"],
-                    bounds_alignment=source["sceneItemTransform"]["boundsAlignment"],
-                    bounds_height=source["sceneItemTransform"]["boundsHeight"],
-                    bounds_type=source["sceneItemTransform"]["boundsType"],
-                    crop_bottom=source["sceneItemTransform"]["cropBottom"],
-                    crop_left=source["sceneItemTransform"]["cropLeft"],
-                    crop_right=source["sceneItemTransform"]["cropRight"],
-                    crop_top=source["sceneItemTransform"]["cropTop"],
-                    height=source["sceneItemTransform"]["height"],
-                    position_x=source["sceneItemTransform"]["positionX"],
-                    position_y=source["sceneItemTransform"]["positionY"],
-                    rotation=source["sceneItemTransform"]["rotation"],
-                    scale_x=source["sceneItemTransform"]["scaleX"],
-                    scale_y=source["sceneItemTransform"]["scaleY"],
-                    source_height=source["sceneItemTransform"]["sourceHeight"],
-                    source_width=source["sceneItemTransform"]["sourceWidth"],
-                    width=source["sceneItemTransform"]["width"],
-                )
-        return None
+        try:
+            source = self._scene_items.get(
+                scene_name,
+                source_name,
+                lambda: self._connection.request("get_scene_item_list", scene_name).scene_items,
+            )
+        except Exception as e:
+            logger.exception("Failed to get scene sources", exc_info=e)
+            metrics.OBS_CLIENT_ERRORS.inc(operation="get_scene_source_position")
+            return None
+
+        if source is None:
+            return None
+
+        return SourcePosition(
+            scene_id=scene_name,
+            scene_item_id=source["sceneItemId"],
+            alignment=source["sceneItemTransform"]["alignment"],
+            bounds_alignment=source["sceneItemTransform"]["boundsAlignment"],
+            bounds_height=source["sceneItemTransform"]["boundsHeight"],
+            bounds_type=source["sceneItemTransform"]["boundsType"],
+            crop_bottom=source["sceneItemTransform"]["cropBottom"],
+            crop_left=source["sceneItemTransform"]["cropLeft"],
+            crop_right=source["sceneItemTransform"]["cropRight"],
+            crop_top=source["sceneItemTransform"]["cropTop"],
+            height=source["sceneItemTransform"]["height"],
+            position_x=source["sceneItemTransform"]["positionX"],
+            position_y=source["sceneItemTransform"]["positionY"],
+            rotation=source["sceneItemTransform"]["rotation"],
+            scale_x=source["sceneItemTransform"]["scaleX"],
+            scale_y=source["sceneItemTransform"]["scaleY"],
+            source_height=source["sceneItemTransform"]["sourceHeight"],
+            source_width=source["sceneItemTransform"]["sourceWidth"],
+            width=source["sceneItemTransform"]["width"],
+        )
 
     def set_scene_source_position(self, position: SourcePosition) -> None:
         scene_item_transform = {
@@ -157,10 +287,16 @@ class ObsClient:
         if position.bounds_height:
             scene_item_transform["boundsHeight"] = position.bounds_height
         try:
-            self._ws.set_scene_item_transform(
-                scene_name=position.scene_id,
-                item_id=position.scene_item_id,
-                transform=scene_item_transform,
+            self._send(
+                "SetSceneItemTransform",
+                {
+                    "sceneName": position.scene_id,
+                    "sceneItemId": position.scene_item_id,
+                    "sceneItemTransform": scene_item_transform,
+                },
+            )
+            self._scene_items.update_transform(
+                position.scene_id, position.scene_item_id, scene_item_transform
             )
             logger.info(
                 "Set OBS scene source position.",
@@ -170,44 +306,70 @@ class ObsClient:
             )
         except Exception as e:
             logger.exception("Failed to set scene source position", exc_info=e)
+            metrics.OBS_CLIENT_ERRORS.inc(operation="set_scene_source_position")
             # raise ObsClientError() from e
 
     def set_rtmp_source_url(self, source_name: str, url: str) -> None:
         try:
-            self._ws.set_input_settings(
-                name=source_name,
-                settings={
-                    "input": url,
-                },
-                overlay=True,
-            )
+            if not self._set_input_settings(source_name, {"input": url}):
+                return
+
             logger.info("Set OBS rtmp source url.", extra={"source_name": source_name, "url": url})
         except Exception as e:
             logger.exception("Failed to set rtmp source url", exc_info=e)
+            metrics.OBS_CLIENT_ERRORS.inc(operation="set_rtmp_source_url")
             # raise ObsClientError() from e
 
-    def get_source_screen_shot(self, source_name: str) -> bytes:
+    def get_source_screen_shot(
+        self,
+        source_name: str,
+        img_format: str = "png",
+        width: int | None = None,
+        quality: int = -1,
+    ) -> bytes:
+        try:
+            return self._screenshots.get(
+                (source_name, img_format, width, quality),
+                lambda: self._fetch_source_screen_shot(source_name, img_format, width, quality),
+            )
+        except TimeoutError as e:
+            logger.warning("Timed out waiting for source screen shot", extra={"error": repr(e)})
+            metrics.OBS_CLIENT_ERRORS.inc(operation="get_source_screen_shot")
+            raise ObsClientError() from e
+
+    def _fetch_source_screen_shot(
+        self, source_name: str, img_format: str, width: int | None, quality: int
+    ) -> bytes:
+        request_data = {
+            "sourceName": source_name,
+            "imageFormat": img_format,
+            "imageCompressionQuality": quality,
+        }
+        if width is not None:
+            # OBS keeps the source aspect ratio when scaling to a single dimension.
+            request_data["imageWidth"] = width
+
         try:
-            response = self._ws.get_source_screenshot(
-                name=source_name,
-                img_format="png",
-                width=1920,
-                height=1080,
-                quality=80,
+            response = self._connection.request(
+                "send", "GetSourceScreenshot", request_data, raw=True
+            )
+            logger.info(
+                "Got OBS source screen shot.",
+                extra={"source_name": source_name, "format": img_format, "width": width},
             )
-            logger.info("Got OBS source screen shot.")
         except Exception as e:
             logger.exception("Failed to get source screen shot", exc_info=e)
+            metrics.OBS_CLIENT_ERRORS.inc(operation="get_source_screen_shot")
             raise ObsClientError() from e
 
         try:
-            img_response = response.image_data
+            img_response = response["imageData"]
             img_b64 = img_response[img_response.find(",") + 1 :]
 
             img = base64.b64decode(img_b64)
         except Exception as e:
             logger.exception("Failed to decode source screen shot", exc_info=e)
+            metrics.OBS_CLIENT_ERRORS.inc(operation="get_source_screen_shot")
             raise ObsClientError() from e
-        self._ws.get_scene_item_list(response.scene_name)
 
         return img
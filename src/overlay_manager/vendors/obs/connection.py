@@ -0,0 +1,230 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+import attrs
+import obsws_python as obs
+from django.conf import settings
+from obsws_python.error import OBSSDKRequestError
+
+from overlay_manager import metrics
+
+logger = logging.getLogger("obs")
+
+T = TypeVar("T")
+
+_OP_REQUEST_BATCH = 8
+_OP_REQUEST_BATCH_RESPONSE = 9
+_EXECUTION_SERIAL_REALTIME = 0
+
+# Told of every request sent from the current context (name, duration, error), e.g. to profile a
+# view.
+request_listener: contextvars.ContextVar[Callable[[str, float, Exception | None], None] | None] = (
+    contextvars.ContextVar("obs_request_listener", default=None)
+)
+
+
+class ObsConnectionError(Exception):
+    pass
+
+
+@attrs.define
+class ConnectionStats:
+    host: str
+    port: int
+    connected: bool = False
+    connects: int = 0
+    connection_failures: int = 0
+    requests: int = 0
+    request_failures: int = 0
+    total_latency: float = 0.0
+    last_latency: float | None = None
+    last_error: str | None = None
+    retry_in: float = 0.0
+
+    @property
+    def average_latency(self) -> float | None:
+        if not self.requests:
+            return None
+
+        return self.total_latency / self.requests
+
+
+# Long-lived authenticated OBS session shared by every caller of the process: requests are
+# serialized, a dropped session is reopened once per request and failed connection attempts are
+# retried with an exponential backoff.
+class ObsConnection:
+    def __init__(self, host: str, port: int, password: str, timeout: float | None) -> None:
+        self._host = host
+        self._port = port
+        self._password = password
+        self._timeout = timeout
+
+        self._lock = threading.RLock()
+        self._ws: obs.ReqClient | None = None
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._stats = ConnectionStats(host=host, port=port)
+
+    def request(self, method: str, *args, **kwargs) -> Any:
+        # Raw requests are labelled with their OBS request type.
+        name = args[0] if method == "send" and args else method
+        return self._call(name, lambda ws: getattr(ws, method)(*args, **kwargs))
+
+    def request_batch(self, requests: list[dict], halt_on_failure: bool = False) -> list[dict]:
+        return self._call(
+            "RequestBatch", lambda ws: _send_request_batch(ws, requests, halt_on_failure)
+        )
+
+    def stats(self) -> ConnectionStats:
+        with self._lock:
+            self._stats.connected = self._ws is not None
+            self._stats.retry_in = max(self._retry_at - time.monotonic(), 0.0)
+            return attrs.evolve(self._stats)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._ws is not None:
+                self._disconnect(None)
+
+    def _call(self, name: str, func: Callable[[obs.ReqClient], T]) -> T:
+        with self._lock:
+            ws, reused = self._connect()
+            try:
+                return self._request(ws, name, func)
+            except OBSSDKRequestError:
+                raise
+            except Exception as e:
+                self._disconnect(e)
+                if not reused:
+                    raise ObsConnectionError() from e
+
+            # The long-lived session was dropped (e.g. OBS restarted), retry once on a new one.
+            ws, _ = self._connect()
+            try:
+                return self._request(ws, name, func)
+            except OBSSDKRequestError:
+                raise
+            except Exception as e:
+                self._disconnect(e)
+                raise ObsConnectionError() from e
+
+    def _request(self, ws: obs.ReqClient, name: str, func: Callable[[obs.ReqClient], T]) -> T:
+        start = time.perf_counter()
+        error = None
+        try:
+            return func(ws)
+        except Exception as e:
+            error = e
+            self._stats.request_failures += 1
+            self._stats.last_error = repr(e)
+            metrics.OBS_REQUEST_FAILURES.inc(method=name)
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            self._stats.requests += 1
+            self._stats.total_latency += latency
+            self._stats.last_latency = latency
+            metrics.OBS_REQUEST_SECONDS.observe(latency, method=name)
+            if (listener := request_listener.get()) is not None:
+                listener(name, latency, error)
+
+    def _connect(self) -> tuple[obs.ReqClient, bool]:
+        if self._ws is not None:
+            return self._ws, True
+
+        if (now := time.monotonic()) < self._retry_at:
+            raise ObsConnectionError(f"OBS connection retry in {self._retry_at - now:.1f}s")
+
+        try:
+            self._ws = obs.ReqClient(
+                host=self._host,
+                port=self._port,
+                password=self._password,
+                timeout=self._timeout,
+            )
+        except Exception as e:
+            self._backoff = min(
+                max(self._backoff * 2, settings.OBS_RECONNECT_BACKOFF_MIN),
+                settings.OBS_RECONNECT_BACKOFF_MAX,
+            )
+            self._retry_at = now + self._backoff
+            self._stats.connection_failures += 1
+            self._stats.last_error = repr(e)
+            metrics.OBS_CONNECTION_FAILURES.inc()
+            logger.exception(
+                "Failed to connect to OBS",
+                exc_info=e,
+                extra={"host": self._host, "port": self._port, "retry_in": self._backoff},
+            )
+            raise ObsConnectionError() from e
+
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._stats.connects += 1
+        logger.info("Connected to OBS.", extra={"host": self._host, "port": self._port})
+
+        return self._ws, False
+
+    def _disconnect(self, error: Exception | None) -> None:
+        if error is not None:
+            self._stats.last_error = repr(error)
+            logger.warning("OBS connection lost", extra={"error": repr(error)})
+
+        try:
+            self._ws.disconnect()
+        except Exception:
+            pass
+        self._ws = None
+
+
+def _send_request_batch(
+    ws: obs.ReqClient, requests: list[dict], halt_on_failure: bool
+) -> list[dict]:
+    # obsws-python has no RequestBatch support, talk the protocol on its socket directly.
+    request_id = str(uuid.uuid4())
+    ws.base_client.ws.send(
+        json.dumps(
+            {
+                "op": _OP_REQUEST_BATCH,
+                "d": {
+                    "requestId": request_id,
+                    "haltOnFailure": halt_on_failure,
+                    "executionType": _EXECUTION_SERIAL_REALTIME,
+                    "requests": requests,
+                },
+            }
+        )
+    )
+
+    while True:
+        response = json.loads(ws.base_client.ws.recv())
+        if (
+            response["op"] == _OP_REQUEST_BATCH_RESPONSE
+            and response["d"]["requestId"] == request_id
+        ):
+            return response["d"]["results"]
+
+
+_connection: ObsConnection | None = None
+_connection_lock = threading.Lock()
+
+
+def get_connection() -> ObsConnection:
+    global _connection
+
+    with _connection_lock:
+        if _connection is None:
+            _connection = ObsConnection(
+                host=settings.OBS_HOST,
+                port=settings.OBS_PORT,
+                password=settings.OBS_PASSWORD,
+                timeout=settings.OBS_TIMEOUT,
+            )
+
+        return _connection
@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+import obsws_python as obs
+from django.conf import settings
+
+logger = logging.getLogger("obs")
+
+
+# OBS event session shared by the caches of OBS state. Each cache registers its event handlers
+# and a reset, called whenever the session (re)starts since anything may have changed while no
+# event was received.
+class ObsEventListener:
+    def __init__(self, host: str, port: int, password: str, timeout: float | None) -> None:
+        self._host = host
+        self._port = port
+        self._password = password
+        self._timeout = timeout
+
+        self._lock = threading.Lock()
+        self._handlers: list[Callable] = []
+        self._resets: list[Callable[[], None]] = []
+        self._events: obs.EventClient | None = None
+        self._retry_at = 0.0
+
+    def register(self, handlers: list[Callable], reset: Callable[[], None]) -> None:
+        # Handlers are dispatched by name, e.g. on_input_settings_changed for InputSettingsChanged.
+        with self._lock:
+            self._handlers.extend(handlers)
+            self._resets.append(reset)
+            if self._events is not None:
+                self._events.callback.register(handlers)
+
+    @property
+    def is_listening(self) -> bool:
+        return self._events is not None and self._events.worker.is_alive()
+
+    def listen(self) -> None:
+        if self.is_listening or time.monotonic() < self._retry_at:
+            return
+
+        with self._lock:
+            if not self.is_listening:
+                self._start_listening()
+
+    def _start_listening(self) -> None:
+        for reset in self._resets:
+            reset()
+
+        try:
+            self._events = obs.EventClient(
+                host=self._host,
+                port=self._port,
+                password=self._password,
+                timeout=self._timeout,
+                subs=(
+                    obs.Subs.SCENES
+                    | obs.Subs.INPUTS
+                    | obs.Subs.SCENEITEMS
+                    | obs.Subs.SCENEITEMTRANSFORMCHANGED
+                ),
+            )
+        except Exception as e:
+            self._events = None
+            self._retry_at = time.monotonic() + settings.OBS_RECONNECT_BACKOFF_MAX
+            logger.exception("Failed to listen to OBS events", exc_info=e)
+            return
+
+        self._events.callback.register(self._handlers)
+
+
+_listener: ObsEventListener | None = None
+_listener_lock = threading.Lock()
+
+
+def get_event_listener() -> ObsEventListener:
+    global _listener
+
+    with _listener_lock:
+        if _listener is None:
+            _listener = ObsEventListener(
+                host=settings.OBS_HOST,
+                port=settings.OBS_PORT,
+                password=settings.OBS_PASSWORD,
+                timeout=settings.OBS_TIMEOUT,
+            )
+
+        return _listener
@@ -0,0 +1,634 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import random
+import secrets
+import struct
+import threading
+import time
+from collections.abc import Callable
+
+import attrs
+
+logger = logging.getLogger("obs")
+
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_OPCODE_CONTINUATION = 0x0
+_OPCODE_TEXT = 0x1
+_OPCODE_CLOSE = 0x8
+_OPCODE_PING = 0x9
+_OPCODE_PONG = 0xA
+
+_OP_HELLO = 0
+_OP_IDENTIFY = 1
+_OP_IDENTIFIED = 2
+_OP_REIDENTIFY = 3
+_OP_EVENT = 5
+_OP_REQUEST = 6
+_OP_REQUEST_RESPONSE = 7
+_OP_REQUEST_BATCH = 8
+_OP_REQUEST_BATCH_RESPONSE = 9
+
+_STATUS_SUCCESS = 100
+_STATUS_UNKNOWN_REQUEST_TYPE = 204
+_STATUS_MISSING_REQUEST_FIELD = 300
+_STATUS_RESOURCE_NOT_FOUND = 600
+_STATUS_REQUEST_PROCESSING_FAILED = 702
+
+_SUBS_SCENES = 1 << 2
+_SUBS_INPUTS = 1 << 3
+_SUBS_UI = 1 << 10
+_SUBS_SCENE_ITEM_TRANSFORM_CHANGED = 1 << 19
+
+# Text sources are given a size from their text, so that layouts depending on it can be tested.
+_CHARACTER_WIDTH = 20.0
+_TEXT_HEIGHT = 50.0
+_WRITABLE_TRANSFORM_FIELDS = {
+    "alignment",
+    "boundsAlignment",
+    "boundsHeight",
+    "boundsType",
+    "boundsWidth",
+    "cropBottom",
+    "cropLeft",
+    "cropRight",
+    "cropTop",
+    "positionX",
+    "positionY",
+    "rotation",
+    "scaleX",
+    "scaleY",
+}
+_SCREENSHOT = (
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+
+class _RequestFailed(Exception):
+    def __init__(self, code: int, comment: str) -> None:
+        super().__init__(comment)
+        self.code = code
+        self.comment = comment
+
+
+@attrs.define
+class RecordedRequest:
+    at: float
+    connection_id: int
+    request_type: str
+    request_data: dict
+    batch_id: str | None
+    ok: bool
+    code: int
+
+
+@attrs.define
+class _Connection:
+    id: int
+    writer: asyncio.StreamWriter
+    event_subscriptions: int = 0
+    identified: bool = False
+
+
+# Stand-in for the OBS WebSocket v5 server, for benchmarks and tests without OBS. It implements the
+# requests used by the OBS client on an in-memory set of scenes and inputs, adds artificial
+# latency, jitter and failures, and records every request it receives.
+class FakeObsServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        password: str = "",
+        scenes: dict[str, list[str]] | None = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        request_cost: float = 0.0,
+        failure_rate: float = 0.0,
+        disconnect_rate: float = 0.0,
+        failing_requests: tuple[str, ...] = (),
+        seed: int | None = None,
+        recorder: Callable[[RecordedRequest], None] | None = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.request_cost = request_cost
+        self.failure_rate = failure_rate
+        self.disconnect_rate = disconnect_rate
+        self.failing_requests = set(failing_requests)
+        self.recorder = recorder
+
+        self._random = random.Random(seed)
+        self._records_lock = threading.Lock()
+        self._records: list[RecordedRequest] = []
+        self._round_trips = 0
+        self._connections: dict[int, _Connection] = {}
+        self._next_connection_id = 1
+        self._server: asyncio.Server | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+        self.program_scene: str | None = None
+        self.preview_scene: str | None = None
+        self.studio_mode_enabled = False
+        self.inputs: dict[str, dict] = {}
+        self.scenes: dict[str, list[dict]] = {}
+        for scene_name, source_names in (scenes or {}).items():
+            self.add_scene(scene_name, source_names)
+
+    def add_scene(self, scene_name: str, source_names: list[str]) -> None:
+        items = self.scenes.setdefault(scene_name, [])
+        for source_name in source_names:
+            self.inputs.setdefault(source_name, {"text": ""})
+            items.append(
+                {
+                    "sceneItemId": len(items) + 1,
+                    "sceneItemIndex": len(items),
+                    "sourceName": source_name,
+                    "sceneItemEnabled": True,
+                    "sceneItemTransform": _default_transform(),
+                }
+            )
+            self._resize(items[-1])
+
+        if self.program_scene is None:
+            self.program_scene = scene_name
+
+    @property
+    def requests(self) -> list[RecordedRequest]:
+        with self._records_lock:
+            return list(self._records)
+
+    @property
+    def round_trips(self) -> int:
+        # Request and request batch messages, each is a round trip for the client.
+        with self._records_lock:
+            return self._round_trips
+
+    def reset_records(self) -> None:
+        with self._records_lock:
+            self._records.clear()
+            self._round_trips = 0
+
+    async def serve(self) -> None:
+        await self._start_server()
+        logger.info("Fake OBS listening.", extra={"host": self.host, "port": self.port})
+
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start(self) -> int:
+        # Serves from a background thread, returns the bound port.
+        started = threading.Event()
+        error: Exception | None = None
+
+        def run() -> None:
+            nonlocal error
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self._start_server())
+            except Exception as e:
+                # e.g. the port is in use, raised again by start.
+                error = e
+                self._loop.close()
+                self._loop = None
+                return
+            finally:
+                started.set()
+
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-obs", daemon=True)
+        self._thread.start()
+        started.wait()
+
+        if error is not None:
+            self._thread.join()
+            raise error
+
+        return self.port
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+
+        async def close() -> None:
+            for connection in list(self._connections.values()):
+                connection.writer.close()
+            self._server.close()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def drop_connections(self) -> None:
+        # Closes the client connections as a restarted OBS would, the server keeps listening.
+        async def close() -> None:
+            for connection in list(self._connections.values()):
+                connection.writer.close()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+
+    async def _start_server(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = _Connection(id=self._next_connection_id, writer=writer)
+        self._next_connection_id += 1
+
+        try:
+            if not await _accept_websocket(reader, writer):
+                return
+
+            self._connections[connection.id] = connection
+            challenge, salt = secrets.token_urlsafe(32), secrets.token_urlsafe(32)
+            hello = {"obsWebSocketVersion": "5.5.0", "rpcVersion": 1}
+            if self.password:
+                hello["authentication"] = {"challenge": challenge, "salt": salt}
+            await self._send(connection, _OP_HELLO, hello)
+
+            while (message := await _read_message(reader, writer)) is not None:
+                await self._dispatch(connection, json.loads(message), challenge, salt)
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            ConnectionError,
+            _Disconnect,
+            # Malformed frames or messages from the client.
+            UnicodeDecodeError,
+            json.JSONDecodeError,
+            KeyError,
+            TypeError,
+        ):
+            pass
+        finally:
+            self._connections.pop(connection.id, None)
+            writer.close()
+
+    async def _dispatch(
+        self, connection: _Connection, message: dict, challenge: str, salt: str
+    ) -> None:
+        op, data = message["op"], message["d"]
+
+        if op == _OP_IDENTIFY:
+            if self.password and data.get("authentication") != _authentication(
+                self.password, challenge, salt
+            ):
+                raise _Disconnect()
+            connection.identified = True
+            connection.event_subscriptions = data.get("eventSubscriptions", 0)
+            await self._send(connection, _OP_IDENTIFIED, {"negotiatedRpcVersion": 1})
+        elif op == _OP_REIDENTIFY and connection.identified:
+            connection.event_subscriptions = data.get("eventSubscriptions", 0)
+            await self._send(connection, _OP_IDENTIFIED, {"negotiatedRpcVersion": 1})
+        elif op == _OP_REQUEST and connection.identified:
+            await self._delay_message()
+            result = await self._run_request(connection, data, batch_id=None)
+            await self._send(
+                connection,
+                _OP_REQUEST_RESPONSE,
+                {"requestId": data.get("requestId"), **result},
+            )
+        elif op == _OP_REQUEST_BATCH and connection.identified:
+            await self._delay_message()
+            results = []
+            for request in data.get("requests", []):
+                result = await self._run_request(connection, request, batch_id=data["requestId"])
+                results.append(result)
+                if data.get("haltOnFailure") and not result["requestStatus"]["result"]:
+                    break
+            await self._send(
+                connection,
+                _OP_REQUEST_BATCH_RESPONSE,
+                {"requestId": data["requestId"], "results": results},
+            )
+
+    async def _delay_message(self) -> None:
+        with self._records_lock:
+            self._round_trips += 1
+
+        if self._random.random() < self.disconnect_rate:
+            raise _Disconnect()
+
+        delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _run_request(
+        self, connection: _Connection, request: dict, batch_id: str | None
+    ) -> dict:
+        request_type = request.get("requestType")
+        request_data = request.get("requestData") or {}
+        if self.request_cost:
+            await asyncio.sleep(self.request_cost)
+
+        response_data = None
+        try:
+            if request_type in self.failing_requests or (
+                self._random.random() < self.failure_rate
+            ):
+                raise _RequestFailed(_STATUS_REQUEST_PROCESSING_FAILED, "Injected failure")
+
+            if not (handler := getattr(self, f"_request_{request_type}", None)):
+                raise _RequestFailed(_STATUS_UNKNOWN_REQUEST_TYPE, "Unknown request type")
+
+            response_data = handler(request_data)
+            status = {"result": True, "code": _STATUS_SUCCESS}
+        except _RequestFailed as e:
+            status = {"result": False, "code": e.code, "comment": e.comment}
+        except KeyError as e:
+            status = {
+                "result": False,
+                "code": _STATUS_MISSING_REQUEST_FIELD,
+                "comment": f"Missing field {e}",
+            }
+
+        record = RecordedRequest(
+            at=time.time(),
+            connection_id=connection.id,
+            request_type=request_type,
+            request_data=request_data,
+            batch_id=batch_id,
+            ok=status["result"],
+            code=status["code"],
+        )
+        with self._records_lock:
+            self._records.append(record)
+        if self.recorder is not None:
+            self.recorder(record)
+
+        result = {"requestType": request_type, "requestStatus": status}
+        if response_data is not None:
+            result["responseData"] = response_data
+        return result
+
+    async def _send(self, connection: _Connection, op: int, data: dict) -> None:
+        connection.writer.write(_frame(_OPCODE_TEXT, json.dumps({"op": op, "d": data}).encode()))
+        await connection.writer.drain()
+
+    def _emit(self, subscription: int, event_type: str, event_data: dict) -> None:
+        frame = _frame(
+            _OPCODE_TEXT,
+            json.dumps(
+                {
+                    "op": _OP_EVENT,
+                    "d": {
+                        "eventType": event_type,
+                        "eventIntent": subscription,
+                        "eventData": event_data,
+                    },
+                }
+            ).encode(),
+        )
+        for connection in self._connections.values():
+            if connection.event_subscriptions & subscription:
+                connection.writer.write(frame)
+
+    def _get_scene(self, scene_name: str) -> list[dict]:
+        if scene_name not in self.scenes:
+            raise _RequestFailed(_STATUS_RESOURCE_NOT_FOUND, f"No scene {scene_name}")
+
+        return self.scenes[scene_name]
+
+    def _resize(self, item: dict) -> None:
+        transform = item["sceneItemTransform"]
+        text = self.inputs.get(item["sourceName"], {}).get("text", "")
+        transform["sourceWidth"] = max(len(text), 1) * _CHARACTER_WIDTH
+        transform["sourceHeight"] = _TEXT_HEIGHT
+        transform["width"] = transform["sourceWidth"] * transform["scaleX"]
+        transform["height"] = transform["sourceHeight"] * transform["scaleY"]
+
+    def _request_GetVersion(self, data: dict) -> dict:
+        return {
+            "obsVersion": "30.0.0",
+            "obsWebSocketVersion": "5.5.0",
+            "rpcVersion": 1,
+            "availableRequests": [
+                name.removeprefix("_request_")
+                for name in dir(self)
+                if name.startswith("_request_")
+            ],
+            "supportedImageFormats": ["png", "jpeg", "jpg", "webp"],
+        }
+
+    def _request_GetSceneList(self, data: dict) -> dict:
+        return {
+            "currentProgramSceneName": self.program_scene,
+            "currentPreviewSceneName": self.preview_scene,
+            "scenes": [
+                {"sceneName": scene_name, "sceneIndex": index}
+                for index, scene_name in enumerate(self.scenes)
+            ],
+        }
+
+    def _request_GetCurrentProgramScene(self, data: dict) -> dict:
+        return {"currentProgramSceneName": self.program_scene}
+
+    def _request_SetCurrentProgramScene(self, data: dict) -> None:
+        self._get_scene(data["sceneName"])
+        self.program_scene = data["sceneName"]
+        self._emit(_SUBS_SCENES, "CurrentProgramSceneChanged", {"sceneName": self.program_scene})
+
+    def _request_GetStudioModeEnabled(self, data: dict) -> dict:
+        return {"studioModeEnabled": self.studio_mode_enabled}
+
+    def _request_SetStudioModeEnabled(self, data: dict) -> None:
+        self.studio_mode_enabled = data["studioModeEnabled"]
+        self._emit(
+            _SUBS_UI, "StudioModeStateChanged", {"studioModeEnabled": self.studio_mode_enabled}
+        )
+
+    def _request_GetCurrentPreviewScene(self, data: dict) -> dict:
+        return {"currentPreviewSceneName": self.preview_scene}
+
+    def _request_SetCurrentPreviewScene(self, data: dict) -> None:
+        if not self.studio_mode_enabled:
+            raise _RequestFailed(_STATUS_REQUEST_PROCESSING_FAILED, "Studio mode is disabled")
+
+        self._get_scene(data["sceneName"])
+        self.preview_scene = data["sceneName"]
+        self._emit(_SUBS_SCENES, "CurrentPreviewSceneChanged", {"sceneName": self.preview_scene})
+
+    def _request_GetSceneItemList(self, data: dict) -> dict:
+        return {"sceneItems": self._get_scene(data["sceneName"])}
+
+    def _request_GetSceneItemTransform(self, data: dict) -> dict:
+        return {"sceneItemTransform": self._get_scene_item(data)["sceneItemTransform"]}
+
+    def _request_SetSceneItemTransform(self, data: dict) -> None:
+        item = self._get_scene_item(data)
+        item["sceneItemTransform"].update(
+            (key, value)
+            for key, value in data["sceneItemTransform"].items()
+            if key in _WRITABLE_TRANSFORM_FIELDS
+        )
+        self._resize(item)
+        self._emit(
+            _SUBS_SCENE_ITEM_TRANSFORM_CHANGED,
+            "SceneItemTransformChanged",
+            {
+                "sceneName": data["sceneName"],
+                "sceneItemId": item["sceneItemId"],
+                "sceneItemTransform": item["sceneItemTransform"],
+            },
+        )
+
+    def _request_GetInputSettings(self, data: dict) -> dict:
+        if data["inputName"] not in self.inputs:
+            raise _RequestFailed(_STATUS_RESOURCE_NOT_FOUND, f"No input {data['inputName']}")
+
+        return {"inputSettings": self.inputs[data["inputName"]], "inputKind": "text_ft2_source_v2"}
+
+    def _request_SetInputSettings(self, data: dict) -> None:
+        input_name = data["inputName"]
+        if input_name not in self.inputs:
+            raise _RequestFailed(_STATUS_RESOURCE_NOT_FOUND, f"No input {input_name}")
+
+        if data.get("overlay", True):
+            self.inputs[input_name].update(data["inputSettings"])
+        else:
+            self.inputs[input_name] = dict(data["inputSettings"])
+
+        for items in self.scenes.values():
+            for item in items:
+                if item["sourceName"] == input_name:
+                    self._resize(item)
+
+        self._emit(
+            _SUBS_INPUTS,
+            "InputSettingsChanged",
+            {"inputName": input_name, "inputSettings": self.inputs[input_name]},
+        )
+
+    def _request_GetSourceScreenshot(self, data: dict) -> dict:
+        if data["sourceName"] not in self.inputs and data["sourceName"] not in self.scenes:
+            raise _RequestFailed(_STATUS_RESOURCE_NOT_FOUND, f"No source {data['sourceName']}")
+
+        # Always the same 1x1 image, whatever the requested format and size.
+        return {"imageData": f"data:image/{data['imageFormat']};base64,{_SCREENSHOT}"}
+
+    def _get_scene_item(self, data: dict) -> dict:
+        for item in self._get_scene(data["sceneName"]):
+            if item["sceneItemId"] == data["sceneItemId"]:
+                return item
+
+        raise _RequestFailed(_STATUS_RESOURCE_NOT_FOUND, f"No scene item {data['sceneItemId']}")
+
+
+class _Disconnect(Exception):
+    pass
+
+
+def _default_transform() -> dict:
+    return {
+        "alignment": 5,
+        "boundsAlignment": 0,
+        "boundsHeight": 0.0,
+        "boundsType": "OBS_BOUNDS_NONE",
+        "boundsWidth": 0.0,
+        "cropBottom": 0,
+        "cropLeft": 0,
+        "cropRight": 0,
+        "cropTop": 0,
+        "height": 0.0,
+        "positionX": 0.0,
+        "positionY": 0.0,
+        "rotation": 0.0,
+        "scaleX": 1.0,
+        "scaleY": 1.0,
+        "sourceHeight": 0.0,
+        "sourceWidth": 0.0,
+        "width": 0.0,
+    }
+
+
+def _authentication(password: str, challenge: str, salt: str) -> str:
+    secret = base64.b64encode(hashlib.sha256((password + salt).encode()).digest())
+    return base64.b64encode(hashlib.sha256(secret + challenge.encode()).digest()).decode()
+
+
+async def _accept_websocket(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+    request = await reader.readuntil(b"\r\n\r\n")
+    headers = {}
+    for line in request.decode("latin-1").split("\r\n")[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if not (key := headers.get("sec-websocket-key")):
+        writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+        await writer.drain()
+        return False
+
+    accept = base64.b64encode(hashlib.sha1((key + _WEBSOCKET_GUID).encode()).digest()).decode()
+    response = [
+        "HTTP/1.1 101 Switching Protocols",
+        "Upgrade: websocket",
+        "Connection: Upgrade",
+        f"Sec-WebSocket-Accept: {accept}",
+    ]
+    if "obswebsocket.json" in headers.get("sec-websocket-protocol", ""):
+        response.append("Sec-WebSocket-Protocol: obswebsocket.json")
+    writer.write(("\r\n".join(response) + "\r\n\r\n").encode())
+    await writer.drain()
+
+    return True
+
+
+async def _read_message(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> bytes | None:
+    message = b""
+
+    while True:
+        first, second = await reader.readexactly(2)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            (length,) = struct.unpack("!H", await reader.readexactly(2))
+        elif length == 127:
+            (length,) = struct.unpack("!Q", await reader.readexactly(8))
+        mask = await reader.readexactly(4) if second & 0x80 else None
+        payload = await reader.readexactly(length)
+        if mask is not None:
+            payload = _unmask(payload, mask)
+
+        if opcode == _OPCODE_CLOSE:
+            writer.write(_frame(_OPCODE_CLOSE, payload[:2]))
+            await writer.drain()
+            return None
+        if opcode == _OPCODE_PING:
+            writer.write(_frame(_OPCODE_PONG, payload))
+            await writer.drain()
+            continue
+        if opcode not in (_OPCODE_TEXT, _OPCODE_CONTINUATION):
+            continue
+
+        message += payload
+        if first & 0x80:
+            return message
+
+
+def _unmask(payload: bytes, mask: bytes) -> bytes:
+    length = len(payload)
+    key = int.from_bytes((mask * (length // 4 + 1))[:length], "big")
+    return (int.from_bytes(payload, "big") ^ key).to_bytes(length, "big")
+
+
+def _frame(opcode: int, payload: bytes) -> bytes:
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+
+    return header + payload
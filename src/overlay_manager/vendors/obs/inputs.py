@@ -0,0 +1,90 @@
+import threading
+import time
+
+import attrs
+from django.conf import settings
+
+from overlay_manager.vendors.obs import events
+
+
+@attrs.define
+class _InputEntry:
+    updated_at: float
+    settings: dict
+
+
+# Last known settings of the OBS inputs, from the successful writes and the OBS input events.
+# While the event listener is connected the mirror follows OBS, otherwise (e.g. for edits made
+# directly in OBS) entries are only trusted for OBS_INPUT_MIRROR_TTL.
+class InputMirror:
+    def __init__(self, listener: events.ObsEventListener) -> None:
+        self._lock = threading.Lock()
+        self._inputs: dict[str, _InputEntry] = {}
+        self._listener = listener
+        self._listener.register(
+            [
+                self.on_input_settings_changed,
+                self.on_input_name_changed,
+                self.on_input_removed,
+            ],
+            self.forget,
+        )
+
+    def is_current(self, input_name: str, input_settings: dict) -> bool:
+        self._listener.listen()
+
+        with self._lock:
+            if not (entry := self._inputs.get(input_name)):
+                return False
+            if (
+                not self._listener.is_listening
+                and time.monotonic() - entry.updated_at >= settings.OBS_INPUT_MIRROR_TTL
+            ):
+                return False
+
+            return all(
+                key in entry.settings and entry.settings[key] == value
+                for key, value in input_settings.items()
+            )
+
+    def update(self, input_name: str, input_settings: dict) -> None:
+        # Written settings are overlaid on the current ones.
+        with self._lock:
+            entry = self._inputs.get(input_name)
+            self._inputs[input_name] = _InputEntry(
+                updated_at=time.monotonic(),
+                settings={**(entry.settings if entry else {}), **input_settings},
+            )
+
+    def forget(self, input_name: str | None = None) -> None:
+        with self._lock:
+            if input_name is None:
+                self._inputs.clear()
+            else:
+                self._inputs.pop(input_name, None)
+
+    def on_input_settings_changed(self, data) -> None:
+        with self._lock:
+            self._inputs[data.input_name] = _InputEntry(
+                updated_at=time.monotonic(), settings=data.input_settings
+            )
+
+    def on_input_name_changed(self, data) -> None:
+        self.forget(data.old_input_name)
+
+    def on_input_removed(self, data) -> None:
+        self.forget(data.input_name)
+
+
+_mirror: InputMirror | None = None
+_mirror_lock = threading.Lock()
+
+
+def get_input_mirror() -> InputMirror:
+    global _mirror
+
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = InputMirror(events.get_event_listener())
+
+        return _mirror
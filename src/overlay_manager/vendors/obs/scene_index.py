@@ -0,0 +1,108 @@
+import threading
+import time
+from collections.abc import Callable
+
+import attrs
+from django.conf import settings
+
+from overlay_manager.vendors.obs import events
+
+
+@attrs.define
+class _SceneEntry:
+    fetched_at: float
+    items: dict[str, dict]
+
+
+# Index of scene items per scene, by source name. Entries expire after OBS_SCENE_ITEM_CACHE_TTL
+# and are kept fresh by OBS scene item events while the event listener is connected.
+class SceneItemIndex:
+    def __init__(self, listener: events.ObsEventListener) -> None:
+        self._lock = threading.Lock()
+        self._scenes: dict[str, _SceneEntry] = {}
+        self._listener = listener
+        self._listener.register(
+            [
+                self.on_scene_item_created,
+                self.on_scene_item_removed,
+                self.on_scene_item_transform_changed,
+                self.on_scene_name_changed,
+                self.on_scene_removed,
+            ],
+            self.invalidate,
+        )
+
+    def get(self, scene_name: str, source_name: str, fetch: Callable[[], list]) -> dict | None:
+        self._listener.listen()
+
+        with self._lock:
+            entry = self._scenes.get(scene_name)
+            if entry and time.monotonic() - entry.fetched_at < settings.OBS_SCENE_ITEM_CACHE_TTL:
+                return entry.items.get(source_name)
+
+        items = {item["sourceName"]: item for item in fetch()}
+        with self._lock:
+            self._scenes[scene_name] = _SceneEntry(fetched_at=time.monotonic(), items=items)
+
+        return items.get(source_name)
+
+    def update_transform(self, scene_name: str, scene_item_id: int, transform: dict) -> None:
+        with self._lock:
+            if not (entry := self._scenes.get(scene_name)):
+                return
+
+            for item in entry.items.values():
+                if item["sceneItemId"] == scene_item_id:
+                    item["sceneItemTransform"] = {**item["sceneItemTransform"], **transform}
+                    return
+
+    def source_changed(self, source_name: str) -> None:
+        # A source update (e.g. a new text) can resize its scene items, without events to
+        # report the new size, the scenes holding the source have to be fetched again.
+        if self.is_listening:
+            return
+
+        with self._lock:
+            for scene_name, entry in list(self._scenes.items()):
+                if source_name in entry.items:
+                    del self._scenes[scene_name]
+
+    def invalidate(self, scene_name: str | None = None) -> None:
+        with self._lock:
+            if scene_name is None:
+                self._scenes.clear()
+            else:
+                self._scenes.pop(scene_name, None)
+
+    @property
+    def is_listening(self) -> bool:
+        return self._listener.is_listening
+
+    def on_scene_item_created(self, data) -> None:
+        self.invalidate(data.scene_name)
+
+    def on_scene_item_removed(self, data) -> None:
+        self.invalidate(data.scene_name)
+
+    def on_scene_item_transform_changed(self, data) -> None:
+        self.update_transform(data.scene_name, data.scene_item_id, data.scene_item_transform)
+
+    def on_scene_name_changed(self, data) -> None:
+        self.invalidate(data.old_scene_name)
+
+    def on_scene_removed(self, data) -> None:
+        self.invalidate(data.scene_name)
+
+
+_index: SceneItemIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_scene_item_index() -> SceneItemIndex:
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            _index = SceneItemIndex(events.get_event_listener())
+
+        return _index
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections.abc import Callable
+
+import attrs
+from django.conf import settings
+
+
+@attrs.define
+class _Screenshot:
+    fetched_at: float
+    image: bytes
+
+
+@attrs.define
+class _PendingScreenshot:
+    done: threading.Event = attrs.Factory(threading.Event)
+    image: bytes | None = None
+    error: Exception | None = None
+
+
+# Short-lived screenshot cache shared by every viewer of the process. Screenshots are kept for
+# OBS_SCREENSHOT_CACHE_TTL, and concurrent requests for the same screenshot wait for the one
+# already asked to OBS instead of asking again.
+class ScreenshotCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._screenshots: dict[tuple, _Screenshot] = {}
+        self._pending: dict[tuple, _PendingScreenshot] = {}
+
+    def get(self, key: tuple, fetch: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            now = time.monotonic()
+            screenshot = self._screenshots.get(key)
+            if screenshot and now - screenshot.fetched_at < settings.OBS_SCREENSHOT_CACHE_TTL:
+                return screenshot.image
+
+            if pending := self._pending.get(key):
+                is_leader = False
+            else:
+                pending = self._pending[key] = _PendingScreenshot()
+                is_leader = True
+
+        if not is_leader:
+            return self._wait(pending)
+
+        try:
+            pending.image = fetch()
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+                if pending.image is not None:
+                    self._store(key, pending.image)
+            pending.done.set()
+
+        return pending.image
+
+    def _wait(self, pending: _PendingScreenshot) -> bytes:
+        if not pending.done.wait(settings.OBS_TIMEOUT):
+            raise TimeoutError("Timed out waiting for the OBS screenshot")
+
+        if pending.error is not None:
+            raise pending.error
+
+        return pending.image
+
+    def _store(self, key: tuple, image: bytes) -> None:
+        now = time.monotonic()
+        for stale_key in [
+            stale_key
+            for stale_key, screenshot in self._screenshots.items()
+            if now - screenshot.fetched_at >= settings.OBS_SCREENSHOT_CACHE_TTL
+        ]:
+            del self._screenshots[stale_key]
+
+        self._screenshots[key] = _Screenshot(fetched_at=now, image=image)
+
+
+_cache: ScreenshotCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_screenshot_cache() -> ScreenshotCache:
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ScreenshotCache()
+
+        return _cache